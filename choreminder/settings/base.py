@@ -35,6 +35,9 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django_htmx.middleware.HtmxMiddleware",
+    "chores.middleware.MetricsMiddleware",
+    "chores.middleware.PerformanceMiddleware",
+    "chores.middleware.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "choreminder.urls"
@@ -65,6 +68,31 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": DATA_DIR / "db.sqlite3",
+        "OPTIONS": {
+            # Number of prepared statements kept per connection
+            "cached_statements": 256,
+        },
+    }
+}
+
+# Applied to every new SQLite connection. WAL lets readers run alongside the
+# writer, see `python manage.py benchmark_sqlite` for the effect of each profile.
+CHOREMINDER_SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 64 * 1024 * 1024,
+    "cache_size": -16 * 1024,  # negative values are in KiB
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
     }
 }
 
@@ -98,6 +126,102 @@ STATIC_URL = "/static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
+# Logging
+# https://docs.djangoproject.com/en/4.1/topics/logging/
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "message": {
+            "format": "%(message)s",
+        },
+    },
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+        },
+        "slow_queries": {
+            "class": "chores.query_log.ProcessRotatingFileHandler",
+            "maxBytes": 10 * 1024 * 1024,
+            "backupCount": 3,
+            "formatter": "message",
+        },
+    },
+    "loggers": {
+        "chores.performance": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "chores.slow_queries": {
+            "handlers": ["slow_queries"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+    },
+}
+
+
 # Other settings
 
 APPEND_SLASH = False
+
+# Add a Server-Timing header with the query count and the time spent in queries, status
+# computation and template rendering to every response, and log the same as a JSON line.
+# Template rendering is only timed when TEMPLATES uses chores.timing.TimedDjangoTemplates,
+# which should be set together with this.
+CHOREMINDER_PERFORMANCE_TIMING = False
+
+# Queries taking at least this many seconds are written with their call site, or None to
+# disable. Every process writes its own file next to CHOREMINDER_SLOW_QUERY_LOG, named
+# after its pid (slow_queries.<pid>.jsonl), and rotates it at 10 MiB. Run
+# `python manage.py slow_queries` to aggregate the files.
+CHOREMINDER_SLOW_QUERY_THRESHOLD = None
+CHOREMINDER_SLOW_QUERY_LOG = DATA_DIR / "slow_queries.jsonl"
+
+# Serve Prometheus metrics at /metrics. Every uwsgi process adds its counts to the shared
+# CHOREMINDER_METRICS_DB at most every FLUSH_INTERVAL seconds. Scrapers authenticate with
+# "Authorization: Bearer <CHOREMINDER_METRICS_TOKEN>", or only superusers may read the
+# metrics when no token is set.
+CHOREMINDER_METRICS = False
+CHOREMINDER_METRICS_DB = DATA_DIR / "metrics.sqlite3"
+CHOREMINDER_METRICS_FLUSH_INTERVAL = 5
+CHOREMINDER_METRICS_TOKEN = None
+
+# Let superusers add ?_profile=1 to any page to get a cProfile summary of the request
+# instead of the page. The full profile is saved to CHOREMINDER_PROFILE_DIR.
+CHOREMINDER_PROFILING = True
+CHOREMINDER_PROFILE_DIR = DATA_DIR / "profiles"
+CHOREMINDER_PROFILE_SUMMARY_LINES = 40
+
+# Log writes arriving while another one is being written are inserted together in the
+# next transaction, without delaying a write that has nothing to wait for. Set to False
+# to write every log on its own.
+CHOREMINDER_LOG_BATCHING = True
+
+# Write transactions that find the database locked are retried this many times,
+# waiting a random time of up to RETRY_DELAY * 2 ** attempt, capped at RETRY_MAX_DELAY.
+CHOREMINDER_WRITE_RETRY_ATTEMPTS = 5
+CHOREMINDER_WRITE_RETRY_DELAY = 0.01
+CHOREMINDER_WRITE_RETRY_MAX_DELAY = 0.2
+
+# Minimum number of logged chores before statuses are projected with the optional
+# NumPy backend, or None to always use the pure-Python backend. Run
+# `python manage.py benchmark_status_backends` to find the crossover point.
+CHOREMINDER_NUMPY_STATUS_THRESHOLD = None
+
+# Progress bars advance in steps of this many percentage points, so a rendered
+# chore list stays valid until a chore changes state or crosses the next step.
+CHOREMINDER_PROGRESS_STEP = 1
+
+# Maximum number of seconds a rendered chore list is served from the cache. Entries
+# expire earlier when a chore's rendered status changes.
+CHOREMINDER_CHORE_LIST_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Number of completed chores loaded per page when the completed group is opened.
+CHOREMINDER_COMPLETED_PAGE_SIZE = 50
+
+# Number of logs shown per page of a chore's history, and fetched per query when it is downloaded.
+CHOREMINDER_LOG_PAGE_SIZE = 50
+CHOREMINDER_LOG_EXPORT_CHUNK_SIZE = 2000
@@ -1,7 +1,18 @@
+import os
+import tempfile
+from pathlib import Path
+
 from .base import *
 
 DEBUG = True
 
+# A file database keeps concurrent tests on the same locking model as production. It is
+# kept in the temporary directory so tests never write next to the real data, and named
+# after the pid so concurrent test runs on one machine never share it.
+DATABASES["default"]["TEST"] = {
+    "NAME": Path(tempfile.gettempdir()) / f"choreminder-test-{os.getpid()}.sqlite3",
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.1/topics/i18n/
 
@@ -1,26 +1,87 @@
-from collections import OrderedDict
+import datetime
+from collections import OrderedDict, defaultdict
+from typing import Iterable, List, Optional, Sequence, Tuple
 
-from . import queries
-from .model_views import ChoreState
+from django.db.models import OuterRef, Q, QuerySet, Subquery
+from django.utils import timezone
+
+from . import model_views, models, queries, timing
+from .away_calendar import AwayCalendar
 from .type_helpers import UserType
 
 
 def get_grouped_sorted_chores(user: UserType, tag_id: int | None):
-    chores = queries.query_chores(user, tag_id)
-    chores.sort(key=lambda chore: chore.weight, reverse=True)
-    groups = {
-        ChoreState.OVERDUE: [],
-        ChoreState.DUE: [],
-        ChoreState.COMPLETED: [],
-    }
-
-    while chores:
-        chore = chores.pop(0)
-        groups[chore.status.state].append(chore)
-
-    groups = OrderedDict((
-        ("Pending", groups[ChoreState.OVERDUE] + groups[ChoreState.DUE]),
-        ("Completed", groups[ChoreState.COMPLETED]),
+    # both groups come from the materialized schedule, ordered by weight in SQL
+    current_time = timezone.now()
+    return OrderedDict((
+        ("Pending", queries.query_pending_chores(user, tag_id, current_time)),
+        ("Completed", queries.query_completed_chores(user, tag_id, current_time, None, None)),
     ))
 
-    return groups
+
+def refresh_last_logged_at(chore_ids: Optional[Iterable[int]] = None) -> int:
+    latest_timestamps = (models.Log.objects
+                         .filter(chore=OuterRef("pk"))
+                         .order_by("-timestamp")
+                         .values("timestamp")[:1])
+
+    chores = models.Chore.objects.all()
+    if chore_ids is not None:
+        chores = chores.filter(pk__in=chore_ids)
+
+    return chores.update(last_logged_at=Subquery(latest_timestamps))
+
+
+@timing.timed("status")
+def schedule_chores(chores: Sequence[models.Chore]):
+    chores_by_user = defaultdict(list)
+    for chore in chores:
+        if chore.last_logged_at is None:
+            chore.next_due = None
+            chore.next_overdue = None
+        else:
+            chores_by_user[chore.user_id].append(chore)
+
+    for user_id, user_chores in chores_by_user.items():
+        calendar = AwayCalendar.for_user(
+            user_id, since=min(chore.last_logged_at for chore in user_chores).date())
+        next_dues, next_overdues = model_views.project_chore_schedules(
+            calendar, user_chores)
+        for chore, next_due, next_overdue in zip(user_chores, next_dues, next_overdues):
+            chore.next_due = next_due
+            chore.next_overdue = next_overdue
+
+
+def refresh_schedules(chores: QuerySet) -> List[models.Chore]:
+    chores = list(chores.only("id", "user_id", "last_logged_at",
+                  "due_duration", "overdue_duration"))
+    schedule_chores(chores)
+    models.Chore.objects.bulk_update(
+        chores, ["next_due", "next_overdue"], batch_size=500)
+    return chores
+
+
+def refresh_logged_chores(chore_ids: Iterable[int]) -> List[models.Chore]:
+    chore_ids = list(chore_ids)
+    refresh_last_logged_at(chore_ids)
+    return refresh_schedules(models.Chore.objects.filter(pk__in=chore_ids))
+
+
+def refresh_away_date_ranges(user_id: int, date_ranges: Iterable[Tuple[datetime.date, datetime.date]]):
+    # a chore is affected when a range overlaps the days between its latest log and its
+    # final projected date, widened by a day on each side to absorb time zone offsets
+    overlaps = Q()
+    for start_date, end_date in date_ranges:
+        window_start = datetime.datetime.combine(
+            start_date - datetime.timedelta(days=1), datetime.time.min, tzinfo=datetime.timezone.utc)
+        window_end = datetime.datetime.combine(
+            end_date + datetime.timedelta(days=1), datetime.time.min, tzinfo=datetime.timezone.utc)
+        overlaps |= Q(last_logged_at__lt=window_end) & (
+            Q(next_overdue__gte=window_start) |
+            Q(next_overdue__isnull=True, next_due__gte=window_start))
+
+    if not overlaps:
+        return
+
+    refresh_schedules(models.Chore.objects.filter(
+        overlaps, user_id=user_id, last_logged_at__isnull=False))
@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.core import checks
+from django.db.backends.signals import connection_created
 
 
 class ChoresConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "chores"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .query_log import install_query_logger
+        from .sqlite import apply_pragmas
+        from .timing import check_template_timing
+
+        connection_created.connect(apply_pragmas)
+        connection_created.connect(install_query_logger)
+        checks.register(check_template_timing)
@@ -0,0 +1,68 @@
+import bisect
+import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from chores import models
+from chores.type_helpers import UserType
+
+
+class AwayCalendar(object):
+
+    def __init__(self, away_dates: Iterable[models.AwayDate]):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+
+        intervals = sorted((away_date.start_date.toordinal(), away_date.end_date.toordinal())
+                           for away_date in away_dates)
+        for start, end in intervals:
+            # merge overlapping and adjacent ranges so every gap holds at least one day
+            if self._ends and start <= self._ends[-1] + 1:
+                self._ends[-1] = max(self._ends[-1], end)
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+
+    @classmethod
+    def for_user(cls, user: UserType, since: Optional[datetime.date] = None) -> "AwayCalendar":
+        filter_args = dict(user=user)
+        if since is not None:
+            filter_args["end_date__gte"] = since
+
+        return cls(models.AwayDate.objects.filter(**filter_args))
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    @property
+    def intervals(self) -> List[Tuple[int, int]]:
+        return list(zip(self._starts, self._ends))
+
+    def is_away(self, date: datetime.date) -> bool:
+        ordinal = date.toordinal()
+        index = bisect.bisect_left(self._ends, ordinal)
+        return index < len(self._starts) and self._starts[index] <= ordinal
+
+    def add_days(self, start_time: datetime.datetime, days: int) -> datetime.datetime:
+        start_ordinal = start_time.date().toordinal()
+        current = start_ordinal
+        remaining = days
+        if remaining <= 0:
+            return start_time
+
+        index = bisect.bisect_right(self._ends, current)
+        while index < len(self._starts):
+            free_days = max(self._starts[index] - current - 1, 0)
+            if remaining <= free_days:
+                break
+
+            remaining -= free_days
+            current = self._ends[index]
+            index += 1
+
+        return start_time + datetime.timedelta(days=current + remaining - start_ordinal)
+
+    def add_delta(self, start_time: datetime.datetime, delta_time: datetime.timedelta) -> datetime.datetime:
+        if bisect.bisect_left(self._ends, start_time.date().toordinal()) == len(self._ends):
+            return start_time + delta_time
+
+        return self.add_days(start_time, delta_time.days)
@@ -0,0 +1,59 @@
+import logging
+import math
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, Sequence
+
+from django.conf import settings
+from django.db import connection
+from django.test import override_settings
+
+
+@contextmanager
+def redirected_logger(name: str, path: str) -> Iterator[None]:
+    logger = logging.getLogger(name)
+    handlers = logger.handlers[:]
+    handler = logging.FileHandler(path, delay=True)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.handlers = [handler]
+    try:
+        yield
+    finally:
+        handler.close()
+        logger.handlers = handlers
+
+
+@contextmanager
+def throwaway_database() -> Iterator[None]:
+    # run against a fresh database so a benchmark never touches real data
+    settings_dict = connection.settings_dict
+    original = {key: settings_dict.get(key) for key in ("NAME", "TEST", "CONN_MAX_AGE", "CONN_HEALTH_CHECKS")}
+    with tempfile.TemporaryDirectory() as directory:
+        # the fresh database reuses the ids of real users, so nothing may share their cache,
+        # metrics or slow query log either
+        slow_query_log = os.path.join(directory, "slow_queries.jsonl")
+        with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+                CACHES={"default": {
+                    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                    "LOCATION": f"throwaway-{directory}",
+                }},
+                CHOREMINDER_METRICS=False,
+                CHOREMINDER_SLOW_QUERY_LOG=slow_query_log), \
+                redirected_logger("chores.slow_queries", slow_query_log):
+            settings_dict["TEST"] = dict(original["TEST"] or {},
+                                         NAME=os.path.join(directory, "benchmark.sqlite3"))
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                yield
+            finally:
+                # create_test_db points the connection at the test database, restore the real one
+                connection.creation.destroy_test_db(original["NAME"], verbosity=0)
+                settings_dict.update(original)
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    # nearest rank, so the result is always an observed value
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
@@ -0,0 +1,81 @@
+import datetime
+import math
+import time
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+DATA_VERSION_KEY = "chores:data-version:{user_id}"
+CHORE_LIST_KEY = "chores:chore-list:{user_id}:{version}:{tag_id}"
+
+
+class CachedChoreList(object):
+
+    # only what is needed to serve the list, so no model instances end up in the shared cache
+    def __init__(self,
+                 html: str,
+                 expires_at: Optional[datetime.datetime] = None,
+                 version: Optional[int] = None):
+        self.html = html
+        self.expires_at = expires_at
+        self.version = version
+        self.built_at = timezone.now()
+
+    def is_expired(self, current_time: datetime.datetime) -> bool:
+        return self.expires_at is not None and self.expires_at <= current_time
+
+    def timeout(self, current_time: datetime.datetime) -> int:
+        max_timeout = settings.CHOREMINDER_CHORE_LIST_CACHE_TIMEOUT
+        if self.expires_at is None:
+            return max_timeout
+
+        return min(max_timeout, math.ceil((self.expires_at - current_time).total_seconds()))
+
+
+def get_data_version(user_id: int) -> int:
+    key = DATA_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        # seed from the clock so an evicted version never matches older entries
+        version = time.time_ns()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+
+    return version
+
+
+def data_version_time(version: int) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(version / 1e9, tz=datetime.timezone.utc)
+
+
+def bump_data_version(user_id: int):
+    # deferred until the write is committed, otherwise a reader still on the old snapshot
+    # could cache stale data under the new version
+    transaction.on_commit(lambda: cache.set(DATA_VERSION_KEY.format(user_id=user_id),
+                                            time.time_ns(), timeout=None))
+
+
+def bump_data_versions(user_ids: Iterable[Optional[int]]):
+    for user_id in set(user_ids):
+        if user_id is not None:
+            bump_data_version(user_id)
+
+
+def get_chore_list(user_id: int,
+                   tag_id: Optional[int],
+                   build: Callable[[int], CachedChoreList]) -> CachedChoreList:
+    version = get_data_version(user_id)
+    key = CHORE_LIST_KEY.format(user_id=user_id,
+                                version=version,
+                                tag_id=tag_id or "")
+    chore_list = cache.get(key)
+    if chore_list is None or chore_list.is_expired(timezone.now()):
+        chore_list = build(version)
+        current_time = timezone.now()
+        if not chore_list.is_expired(current_time):
+            cache.set(key, chore_list, timeout=chore_list.timeout(current_time))
+
+    return chore_list
@@ -1,10 +1,23 @@
 from django import forms
+from django.core.exceptions import ValidationError
+from django.forms.models import ModelChoiceIterator
 
 from chores import models
 from chores.type_helpers import UserType
 
 
+class CachedModelChoiceIterator(ModelChoiceIterator):
+
+    def __iter__(self):
+        # iterate the queryset itself so its result cache is reused between renders
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for obj in self.queryset:
+            yield self.choice(obj)
+
+
 class TagChoiceField(forms.ModelChoiceField):
+    iterator = CachedModelChoiceIterator
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -12,6 +25,24 @@ class TagChoiceField(forms.ModelChoiceField):
     def label_from_instance(self, tag: models.Tag) -> str:
         return tag.name
 
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+
+        key = self.to_field_name or "pk"
+        if isinstance(value, self.queryset.model):
+            value = getattr(value, key)
+
+        for tag in self.queryset:
+            if str(getattr(tag, key)) == str(value):
+                return tag
+
+        raise ValidationError(
+            self.error_messages["invalid_choice"],
+            code="invalid_choice",
+            params={"value": value},
+        )
+
 
 class TagMultipleChoiceField(forms.ModelMultipleChoiceField):
 
@@ -60,6 +91,14 @@ class TagFilterForm(forms.Form):
         return len(self.fields["tag"].queryset) != 0
 
 
+class ChoreSelectionForm(forms.Form):
+    chore_ids = forms.ModelMultipleChoiceField(queryset=None)
+
+    def __init__(self, user: UserType, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["chore_ids"].queryset = models.Chore.objects.filter(user=user)
+
+
 class AwayDateForm(forms.ModelForm):
     class Meta:
         model = models.AwayDate
@@ -0,0 +1,150 @@
+import json
+import re
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from chores import benchmarking, models, seeding
+
+CHORE_LIST_TOKEN = re.compile(r'name="chore_list_token" value="([^"]*)"')
+
+
+def find_chore_list_token(response: HttpResponse) -> Optional[str]:
+    match = CHORE_LIST_TOKEN.search(response.content.decode())
+    return match.group(1) if match is not None else None
+
+
+class Command(BaseCommand):
+    help = "Benchmark the main views through the test client against a generated dataset"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=100,
+                            help="Number of timed requests per scenario")
+        parser.add_argument("--users", type=int, default=1,
+                            help="Number of users in the dataset")
+        parser.add_argument("--chores", type=int, default=50,
+                            help="Number of chores per user")
+        parser.add_argument("--logs-per-chore", type=int, default=10,
+                            help="Number of logs per chore")
+        parser.add_argument("--away-dates", type=int, default=5,
+                            help="Number of away dates per user")
+        parser.add_argument("--tags", type=int, default=5,
+                            help="Number of tags per user")
+        parser.add_argument("--seed", type=int, default=0,
+                            help="Seed of the generated dataset")
+        parser.add_argument("--output", default="-",
+                            help="File the JSON results are written to, or - for stdout")
+
+    def scenarios(self, client: Client, user) -> Dict[str, Callable[[int], Any]]:
+        chore_ids = list(models.Chore.objects.filter(user=user).order_by("id").values_list("id", flat=True))
+        tag = models.Tag.objects.filter(user=user).order_by("id").first()
+        index_url = reverse("chores:index")
+
+        token = None
+
+        def log_url(index: int) -> str:
+            return reverse("chores:log_chore", args=(chore_ids[index % len(chore_ids)],))
+
+        def log_chore_htmx(index: int):
+            # like the client, post the token of the list shown and keep the one swapped in
+            nonlocal token
+            if token is None:
+                token = find_chore_list_token(client.get(index_url))
+            response = client.post(log_url(index), dict(chore_list_token=token), headers={"HX-Request": "true"})
+            token = find_chore_list_token(response)
+            return response
+
+        return dict(
+            index=lambda index: client.get(index_url),
+            index_tag=lambda index: client.get(index_url, dict(tag=tag.id if tag else "")),
+            log_chore=lambda index: client.post(log_url(index)),
+            log_chore_htmx=log_chore_htmx,
+            # without a token the whole chore list is re-rendered
+            log_chore_htmx_full=lambda index: client.post(log_url(index), headers={"HX-Request": "true"}),
+            list_tags=lambda index: client.get(reverse("chores:list_tags")),
+            list_away_dates=lambda index: client.get(reverse("chores:list_away_dates")),
+        )
+
+    def measure(self, request_count: int, send: Callable[[int], Any]) -> Dict[str, Any]:
+        latencies: List[float] = []
+        query_counts: List[int] = []
+        for index in range(request_count):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = send(index)
+                latencies.append(time.perf_counter() - start)
+
+            if response.status_code >= 400:
+                raise RuntimeError(f"Request failed with status {response.status_code}")
+
+            query_counts.append(len(captured.captured_queries))
+
+        # tracing slows allocations down, so memory is measured on a separate request
+        tracemalloc.start()
+        try:
+            send(request_count)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return dict(
+            requests=request_count,
+            p50_ms=round(benchmarking.percentile(latencies, 50) * 1000, 3),
+            p95_ms=round(benchmarking.percentile(latencies, 95) * 1000, 3),
+            p99_ms=round(benchmarking.percentile(latencies, 99) * 1000, 3),
+            queries=round(statistics.mean(query_counts), 2),
+            peak_memory_kib=round(peak_memory / 1024, 1),
+        )
+
+    def run_benchmark(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        users = seeding.seed_dataset(
+            users=options["users"],
+            chores=options["chores"],
+            logs_per_chore=options["logs_per_chore"],
+            away_dates=options["away_dates"],
+            tags=options["tags"],
+            seed=options["seed"])
+        client = Client()
+        client.force_login(users[0])
+
+        results = {}
+        for name, send in self.scenarios(client, users[0]).items():
+            send(-1)  # warm up imports, templates and caches
+            results[name] = self.measure(options["requests"], send)
+
+        return results
+
+    def handle(self, *args: Any, **options: Any) -> Optional[str]:
+        if options["users"] < 1 or options["chores"] < 1 or options["requests"] < 1:
+            raise CommandError("The benchmark needs at least one user, chore and request")
+
+        with benchmarking.throwaway_database():
+            results = self.run_benchmark(options)
+
+        report = dict(
+            dataset={key: options[key] for key in
+                     ("users", "chores", "logs_per_chore", "away_dates", "tags", "seed")},
+            results=results,
+        )
+        if options["output"] == "-":
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        with open(options["output"], "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+            output.write("\n")
+
+        self.stdout.write(f"{'scenario':>19} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} "
+                          f"{'queries':>8} {'peak (KiB)':>11}")
+        for name, result in results.items():
+            self.stdout.write(f"{name:>19} {result['p50_ms']:>9.3f} {result['p95_ms']:>9.3f} "
+                              f"{result['p99_ms']:>9.3f} {result['queries']:>8.2f} "
+                              f"{result['peak_memory_kib']:>11.1f}")
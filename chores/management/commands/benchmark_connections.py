@@ -0,0 +1,76 @@
+import time
+from typing import Any, Dict, Optional
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.urls import reverse
+
+from chores import benchmarking, models, seeding
+
+PROFILES = (
+    ("per request", dict(CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=False)),
+    ("persistent", dict(CONN_MAX_AGE=None, CONN_HEALTH_CHECKS=True)),
+)
+
+
+class Command(BaseCommand):
+    help = "Measure the per-request connection overhead saved by persistent database connections"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200,
+                            help="Number of requests per view and profile")
+        parser.add_argument("--chores", type=int, default=50,
+                            help="Number of chores in the benchmark database")
+
+    def time_requests(self, request_count: int, send) -> float:
+        start = time.perf_counter()
+        for index in range(request_count):
+            # the test client skips the connection handling a wsgi server triggers
+            close_old_connections()
+            send(index)
+            close_old_connections()
+
+        return (time.perf_counter() - start) / request_count
+
+    def run_profiles(self, options: Dict[str, Any]):
+        user, = seeding.seed_dataset(chores=options["chores"], logs_per_chore=1, away_dates=0, tags=0)
+        chore_ids = list(models.Chore.objects.filter(user=user).values_list("id", flat=True))
+        client = Client()
+        client.force_login(user)
+
+        opened = []
+
+        def count_connection(sender, **kwargs):
+            opened.append(sender)
+
+        connection_created.connect(count_connection)
+        results = {}
+        try:
+            for name, profile in PROFILES:
+                connection.close()
+                connection.settings_dict.update(profile)
+                opened.clear()
+                index_time = self.time_requests(
+                    options["requests"], lambda index: client.get(reverse("chores:index")))
+                log_time = self.time_requests(
+                    options["requests"], lambda index: client.post(
+                        reverse("chores:log_chore", args=(chore_ids[index % len(chore_ids)],))))
+                results[name] = (index_time, log_time, len(opened))
+        finally:
+            connection_created.disconnect(count_connection)
+
+        return results
+
+    def handle(self, *args: Any, **options: Any) -> Optional[str]:
+        with benchmarking.throwaway_database():
+            results = self.run_profiles(options)
+
+        self.stdout.write(f"{'profile':>12} {'index (ms)':>11} {'log (ms)':>9} {'connections':>12}")
+        for name, (index_time, log_time, opened) in results.items():
+            self.stdout.write(f"{name:>12} {index_time * 1000:>11.3f} {log_time * 1000:>9.3f} {opened:>12}")
+
+        (base_index, base_log, _), (index_time, log_time, _) = results.values()
+        self.stdout.write(f"saved per request: index {(base_index - index_time) * 1000:.3f} ms, "
+                          f"log {(base_log - log_time) * 1000:.3f} ms")
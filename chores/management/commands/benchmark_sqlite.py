@@ -0,0 +1,149 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from chores import sqlite
+
+SCHEMA = (
+    "CREATE TABLE chore (id INTEGER PRIMARY KEY, user_id INTEGER, name TEXT, last_logged_at TEXT)",
+    "CREATE INDEX chore_user_id ON chore (user_id, id)",
+    "CREATE TABLE log (id INTEGER PRIMARY KEY, chore_id INTEGER, timestamp TEXT)",
+    "CREATE INDEX log_chore_timestamp ON log (chore_id, timestamp DESC)",
+)
+USERS = 10
+
+
+def connect(path: str, pragmas: Dict[str, Any], timeout: float) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, timeout=timeout, isolation_level=None,
+                                 check_same_thread=False)
+    for statement in sqlite.pragma_statements(pragmas):
+        connection.execute(statement)
+
+    return connection
+
+
+def create_database(path: str, chores: int):
+    connection = sqlite3.connect(path, isolation_level=None)
+    for statement in SCHEMA:
+        connection.execute(statement)
+
+    connection.execute("BEGIN")
+    connection.executemany("INSERT INTO chore (user_id, name) VALUES (?, ?)",
+                           ((index % USERS, f"Chore {index}") for index in range(chores)))
+    connection.execute("COMMIT")
+    connection.close()
+
+
+def read_chores(connection: sqlite3.Connection, rng: random.Random, chores: int):
+    connection.execute(
+        "SELECT chore.id, chore.name, chore.last_logged_at FROM chore "
+        "WHERE chore.user_id = ? ORDER BY chore.last_logged_at",
+        (rng.randrange(USERS),)).fetchall()
+
+
+def write_log(connection: sqlite3.Connection, rng: random.Random, chores: int):
+    chore_id = rng.randint(1, chores)
+    timestamp = time.time()
+    connection.execute("BEGIN")
+    connection.execute("INSERT INTO log (chore_id, timestamp) VALUES (?, ?)",
+                       (chore_id, timestamp))
+    connection.execute("UPDATE chore SET last_logged_at = ? WHERE id = ?",
+                       (timestamp, chore_id))
+    connection.execute("COMMIT")
+
+
+Operation = Callable[[sqlite3.Connection, random.Random, int], None]
+
+
+class Worker(threading.Thread):
+
+    def __init__(self,
+                 connection: sqlite3.Connection,
+                 operation: Operation,
+                 chores: int,
+                 deadline: float,
+                 seed: int):
+        super().__init__()
+        self.connection = connection
+        self.operation = operation
+        self.chores = chores
+        self.deadline = deadline
+        self.rng = random.Random(seed)
+        self.operations = 0
+        self.busy = 0
+
+    def run(self):
+        while time.perf_counter() < self.deadline:
+            try:
+                self.operation(self.connection, self.rng, self.chores)
+                self.operations += 1
+            except sqlite3.OperationalError:
+                if self.connection.in_transaction:
+                    self.connection.execute("ROLLBACK")
+                self.busy += 1
+
+        self.connection.close()
+
+
+class Command(BaseCommand):
+    help = "Compare SQLite reader and writer throughput with and without CHOREMINDER_SQLITE_PRAGMAS"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--duration", type=float, default=5.0,
+                            help="Seconds to run each profile for")
+        parser.add_argument("--readers", type=int, default=3,
+                            help="Number of concurrent reader connections")
+        parser.add_argument("--writers", type=int, default=1,
+                            help="Number of concurrent writer connections")
+        parser.add_argument("--chores", type=int, default=1000,
+                            help="Number of chores in the benchmark database")
+        parser.add_argument("--timeout", type=float, default=5.0,
+                            help="Seconds a connection waits for a lock before failing")
+
+    def run_profile(self, pragmas: Dict[str, Any], options: Dict[str, Any]) -> Dict[str, float]:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "benchmark.sqlite3")
+            create_database(path, options["chores"])
+
+            deadline = time.perf_counter() + options["duration"]
+            readers = [Worker(connect(path, pragmas, options["timeout"]), read_chores,
+                              options["chores"], deadline, seed)
+                       for seed in range(options["readers"])]
+            writers = [Worker(connect(path, pragmas, options["timeout"]), write_log,
+                              options["chores"], deadline, -seed)
+                       for seed in range(1, options["writers"] + 1)]
+            for worker in readers + writers:
+                worker.start()
+            for worker in readers + writers:
+                worker.join()
+
+        return dict(
+            reads=sum(worker.operations for worker in readers) / options["duration"],
+            writes=sum(worker.operations for worker in writers) / options["duration"],
+            busy=sum(worker.busy for worker in readers + writers),
+        )
+
+    def handle(self, *args: Any, **options: Any) -> Optional[str]:
+        profiles = (
+            ("default", {}),
+            ("configured", settings.CHOREMINDER_SQLITE_PRAGMAS),
+        )
+
+        results = {}
+        self.stdout.write(f"{'profile':>10} {'reads/s':>10} {'writes/s':>10} {'busy':>6}")
+        for name, pragmas in profiles:
+            result = results[name] = self.run_profile(pragmas, options)
+            self.stdout.write(
+                f"{name:>10} {result['reads']:>10.1f} {result['writes']:>10.1f} {result['busy']:>6}")
+
+        for kind in ("reads", "writes"):
+            if results["default"][kind]:
+                self.stdout.write(
+                    f"{kind}: {results['configured'][kind] / results['default'][kind]:.2f}x")
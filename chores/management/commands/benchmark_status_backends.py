@@ -0,0 +1,78 @@
+import datetime
+import random
+import time
+from typing import Any, Callable, Optional
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from chores import model_views, models, numpy_backend
+from chores.away_calendar import AwayCalendar
+
+
+def best_time(func: Callable[[], Any], repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+class Command(BaseCommand):
+    help = "Compare the pure-Python and NumPy status projection backends"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10,50,100,500,1000,2000,5000,10000,50000",
+                            help="Comma separated chore counts to benchmark")
+        parser.add_argument("--away-dates", type=int, default=100,
+                            help="Number of away date ranges in the calendar")
+        parser.add_argument("--repeat", type=int, default=5,
+                            help="Number of runs per size, the best one is reported")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args: Any, **options: Any) -> Optional[str]:
+        if not numpy_backend.is_available():
+            raise CommandError("NumPy is not installed")
+
+        rng = random.Random(options["seed"])
+        now = timezone.now()
+
+        away_dates = []
+        for _ in range(options["away_dates"]):
+            start_date = (now - datetime.timedelta(days=rng.randint(0, 3 * 365))).date()
+            away_dates.append(models.AwayDate(
+                start_date=start_date,
+                end_date=start_date + datetime.timedelta(days=rng.randint(0, 14))))
+        calendar = AwayCalendar(away_dates)
+
+        crossover = None
+        self.stdout.write(f"{'chores':>8} {'python (ms)':>12} {'numpy (ms)':>12} {'speedup':>8}")
+        for size in map(int, options["sizes"].split(",")):
+            latest_log_timestamps = [now - datetime.timedelta(days=rng.randint(0, 3 * 365))
+                                     for _ in range(size)]
+            due_durations = [datetime.timedelta(days=rng.choice((1, 7, 30, 90, 365)))
+                             for _ in range(size)]
+            overdue_durations = [rng.choice((None, datetime.timedelta(days=1), datetime.timedelta(days=7)))
+                                 for _ in range(size)]
+            projection_args = (calendar, latest_log_timestamps,
+                               due_durations, overdue_durations)
+
+            python_time = best_time(
+                lambda: model_views.project_due_dates(*projection_args), options["repeat"])
+            numpy_time = best_time(
+                lambda: numpy_backend.project_due_dates(*projection_args), options["repeat"])
+
+            if crossover is None and numpy_time < python_time:
+                crossover = size
+
+            self.stdout.write(
+                f"{size:>8} {python_time * 1000:>12.3f} {numpy_time * 1000:>12.3f} "
+                f"{python_time / numpy_time:>7.2f}x")
+
+        if crossover is None:
+            self.stdout.write("NumPy was not faster at any benchmarked size")
+        else:
+            self.stdout.write(f"NumPy is faster from {crossover} chores")
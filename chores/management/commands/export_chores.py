@@ -0,0 +1,37 @@
+from typing import Any, Optional
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from chores import transfer
+
+
+class Command(BaseCommand):
+    help = "Stream the chores, tags, logs and away dates of a user as JSONL or CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", required=True,
+                            help="Username whose data is exported")
+        parser.add_argument("--format", choices=sorted(transfer.WRITERS), default="jsonl",
+                            help="Output format")
+        parser.add_argument("--output", default="-",
+                            help="File to write to, or - for stdout")
+        parser.add_argument("--chunk-size", type=int, default=2000,
+                            help="Number of rows fetched from the database at a time")
+
+    def handle(self, *args: Any, **options: Any) -> Optional[str]:
+        try:
+            user = get_user_model().objects.get_by_natural_key(options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"Unknown user: {options['user']}")
+
+        records = transfer.export_records(user, options["chunk_size"])
+        write = transfer.WRITERS[options["format"]]
+        if options["output"] == "-":
+            write(records, self.stdout)
+            return
+
+        with open(options["output"], "w", newline="", encoding="utf-8") as output:
+            count = write(records, output)
+
+        self.stderr.write(f"Exported {count} records to {options['output']}")
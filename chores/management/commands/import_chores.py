@@ -0,0 +1,48 @@
+import sys
+from typing import Any, Optional
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from chores import transfer
+
+
+class Command(BaseCommand):
+    help = "Import chores, tags, logs and away dates exported by export_chores into a user"
+
+    def add_arguments(self, parser):
+        parser.add_argument("input",
+                            help="File to read from, or - for stdin")
+        parser.add_argument("--user", required=True,
+                            help="Username the imported data is assigned to")
+        parser.add_argument("--format", choices=sorted(transfer.READERS), default="jsonl",
+                            help="Input format")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Number of rows inserted per statement")
+        parser.add_argument("--commit-per-batch", action="store_true",
+                            help="Commit every batch on its own so the app stays writable during a long "
+                                 "import. A failed import keeps the batches committed before the error, "
+                                 "so running it again imports them twice")
+
+    def import_file(self, user, input, options):
+        try:
+            return transfer.import_records(
+                user, transfer.READERS[options["format"]](input), options["batch_size"],
+                options["commit_per_batch"])
+        except transfer.InvalidRecord as error:
+            raise CommandError(f"Invalid import data on {error}")
+
+    def handle(self, *args: Any, **options: Any) -> Optional[str]:
+        try:
+            user = get_user_model().objects.get_by_natural_key(options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"Unknown user: {options['user']}")
+
+        if options["input"] == "-":
+            counts = self.import_file(user, sys.stdin, options)
+        else:
+            with open(options["input"], newline="", encoding="utf-8") as input:
+                counts = self.import_file(user, input, options)
+
+        self.stdout.write("Imported " + ", ".join(
+            f"{count} {record_type} records" for record_type, count in counts.items()))
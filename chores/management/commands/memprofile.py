@@ -0,0 +1,117 @@
+import gc
+import json
+import tracemalloc
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.utils import timezone
+
+from chores import actions, benchmarking, queries, seeding, views
+
+
+class Command(BaseCommand):
+    help = "Measure the memory used by each stage of building the chore list with tracemalloc"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user",
+                            help="Profile the chores of this existing user instead of a generated dataset")
+        parser.add_argument("--chores", type=int, default=10000,
+                            help="Number of chores in the generated dataset")
+        parser.add_argument("--logs-per-chore", type=int, default=3,
+                            help="Number of logs per chore in the generated dataset")
+        parser.add_argument("--top", type=int, default=10,
+                            help="Number of allocation sites shown per stage")
+        parser.add_argument("--frames", type=int, default=1,
+                            help="Number of stack frames tracemalloc records per allocation")
+        parser.add_argument("--output",
+                            help="File the JSON results are written to, to compare runs over time")
+
+    def stages(self, user, pending_chores, summary) -> Dict[str, Tuple[Callable[[], Any], int]]:
+        # each stage with the number of chores it loads. Grouping materializes every chore with its
+        # model view and status, the index itself only queries and renders the pending ones
+        return OrderedDict((
+            ("get_grouped_sorted_chores", (lambda: actions.get_grouped_sorted_chores(user, None),
+                                           summary["Pending"] + summary["Completed"])),
+            ("query_pending_chores", (lambda: queries.query_pending_chores(user, None, timezone.now()),
+                                      len(pending_chores))),
+            ("render", (lambda: views.render_chore_list(pending_chores, summary, None, 0),
+                        len(pending_chores))),
+        ))
+
+    def measure(self, func: Callable[[], Any], chore_count: int, top: int) -> Dict[str, Any]:
+        func()  # compile templates and fill one-off caches outside the measurement
+        # collect the cycles left by earlier stages so they are not freed during this one
+        gc.collect()
+        before = tracemalloc.take_snapshot()
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+        result = func()  # noqa: F841, kept alive so the snapshot counts what the stage retains
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        del result
+
+        statistics = [stat for stat in after.compare_to(before, "lineno") if stat.size_diff > 0]
+        retained = current - baseline
+        return dict(
+            chores=chore_count,
+            peak_bytes=peak - baseline,
+            retained_bytes=retained,
+            bytes_per_chore=round(retained / chore_count, 1) if chore_count else None,
+            top_lines=[dict(
+                line=str(stat.traceback[0]),
+                size_bytes=stat.size_diff,
+                count=stat.count_diff,
+            ) for stat in statistics[:top]],
+        )
+
+    def profile(self, user, options: Dict[str, Any]) -> Dict[str, Any]:
+        current_time = timezone.now()
+        pending_chores = queries.query_pending_chores(user, None, current_time)
+        summary = queries.query_group_summary(user, None, current_time)
+        results = OrderedDict()
+        # DEBUG would keep every query in memory and show up in the allocations
+        with override_settings(DEBUG=False):
+            tracemalloc.start(options["frames"])
+            try:
+                for name, (func, chore_count) in self.stages(user, pending_chores, summary).items():
+                    results[name] = self.measure(func, chore_count, options["top"])
+            finally:
+                tracemalloc.stop()
+
+        return dict(chores=summary["Pending"] + summary["Completed"], pending_chores=len(pending_chores),
+                    stages=results)
+
+    def write_report(self, report: Dict[str, Any]):
+        self.stdout.write(f"{report['chores']} chores, {report['pending_chores']} pending")
+        for name, result in report["stages"].items():
+            self.stdout.write(f"\n{name}: peak {result['peak_bytes'] / 1024:.1f} KiB, "
+                              f"retained {result['retained_bytes'] / 1024:.1f} KiB "
+                              f"({result['bytes_per_chore']} bytes per chore over {result['chores']} chores)")
+            lines: List[Dict[str, Any]] = result["top_lines"]
+            for line in lines:
+                self.stdout.write(f"  {line['size_bytes'] / 1024:>10.1f} KiB {line['count']:>8} blocks  {line['line']}")
+
+    def handle(self, *args: Any, **options: Any) -> Optional[str]:
+        if options["user"] is not None:
+            try:
+                user = get_user_model().objects.get_by_natural_key(options["user"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"Unknown user: {options['user']}")
+
+            report = self.profile(user, options)
+        else:
+            with benchmarking.throwaway_database():
+                user, = seeding.seed_dataset(chores=options["chores"],
+                                             logs_per_chore=options["logs_per_chore"],
+                                             away_dates=5, tags=5)
+                report = self.profile(user, options)
+
+        self.write_report(report)
+        if options["output"] is not None:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                json.dump(report, output, indent=2)
+                output.write("\n")
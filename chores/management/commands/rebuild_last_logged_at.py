@@ -0,0 +1,15 @@
+from typing import Any, Optional
+
+from django.core.management.base import BaseCommand
+
+from chores import actions, models
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized latest log timestamp and schedule of every chore"
+
+    def handle(self, *args: Any, **options: Any) -> Optional[str]:
+        updated = actions.refresh_last_logged_at()
+        actions.refresh_schedules(models.Chore.objects.all())
+        self.stdout.write(
+            f"Rebuilt the latest log timestamp and schedule of {updated} chores")
@@ -0,0 +1,64 @@
+import time
+from typing import Any, Optional
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from chores import seeding
+
+
+class Command(BaseCommand):
+    help = "Generate a deterministic large dataset of users, tags, chores, logs and away dates"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10,
+                            help="Number of users to generate")
+        parser.add_argument("--chores", type=int, default=100,
+                            help="Number of chores per user")
+        parser.add_argument("--years", type=float, default=3,
+                            help="Length of the generated log history")
+        parser.add_argument("--away-dates", type=int, default=20,
+                            help="Number of away dates per user")
+        parser.add_argument("--tags", type=int, default=8,
+                            help="Number of tags per user")
+        parser.add_argument("--seed", type=int, default=0,
+                            help="Seed of the generated dataset")
+        parser.add_argument("--username-prefix", default="scale",
+                            help="Prefix of the generated usernames")
+        parser.add_argument("--now", type=parse_datetime,
+                            help="ISO timestamp the histories end at, pin it to reproduce a dataset exactly")
+        parser.add_argument("--batch-size", type=int, default=seeding.BATCH_SIZE,
+                            help="Number of rows inserted per statement")
+        parser.add_argument("--transaction-size", type=int, default=seeding.TRANSACTION_SIZE,
+                            help="Number of logs inserted per transaction")
+
+    def handle(self, *args: Any, **options: Any) -> Optional[str]:
+        prefix = options["username_prefix"]
+        if get_user_model().objects.filter(username__startswith=f"{prefix}-").exists():
+            raise CommandError(f"Users prefixed with {prefix}- already exist, pick another --username-prefix")
+
+        start = time.perf_counter()
+        total = 0
+
+        def report(user, log_count: int):
+            nonlocal total
+            total += log_count
+            self.stdout.write(f"Seeded {user.username} with {log_count} logs")
+
+        seeding.seed_dataset(
+            users=options["users"],
+            chores=options["chores"],
+            logs_per_chore=None,
+            years=options["years"],
+            away_dates=options["away_dates"],
+            tags=options["tags"],
+            seed=options["seed"],
+            username_prefix=prefix,
+            now=options["now"],
+            batch_size=options["batch_size"],
+            transaction_size=options["transaction_size"],
+            progress=report)
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"Seeded {total} logs in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} logs/s)")
@@ -0,0 +1,67 @@
+import glob
+import json
+import os
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from chores import query_log
+
+
+class Command(BaseCommand):
+    help = "Aggregate the slow query log by normalized SQL fingerprint"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default=str(settings.CHOREMINDER_SLOW_QUERY_LOG),
+                            help="Slow query log to read, the files of every process and their "
+                                 "rotated backups are read as well")
+        parser.add_argument("--limit", type=int, default=20,
+                            help="Number of fingerprints to show")
+        parser.add_argument("--sort", choices=("total", "count", "max"), default="total",
+                            help="Order of the fingerprints")
+
+    def log_files(self, path: str) -> List[str]:
+        # the file of every process, each with its rotated backups oldest first
+        files = []
+        for log_path in [path, *sorted(glob.glob(str(query_log.process_log_path(path, "[0-9]*"))))]:
+            index = 1
+            while os.path.exists(f"{log_path}.{index}"):
+                index += 1
+
+            files.extend(f"{log_path}.{backup}" for backup in range(index - 1, 0, -1))
+            if os.path.exists(log_path):
+                files.append(log_path)
+
+        return files
+
+    def read_entries(self, path: str) -> Iterator[Dict[str, Any]]:
+        for file_path in self.log_files(path):
+            with open(file_path, encoding="utf-8") as input:
+                for line in input:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        self.stderr.write(f"Skipping malformed line in {file_path}")
+
+    def handle(self, *args: Any, **options: Any) -> Optional[str]:
+        groups: Dict[str, List[float]] = defaultdict(list)
+        callers: Dict[str, Counter] = defaultdict(Counter)
+        for entry in self.read_entries(options["path"]):
+            key = query_log.fingerprint(entry["sql"])
+            groups[key].append(entry["duration_ms"])
+            callers[key][entry.get("caller") or "unknown"] += 1
+
+        if not groups:
+            self.stdout.write("No slow queries logged")
+            return
+
+        sort_keys = dict(total=sum, count=len, max=max)
+        ranked = sorted(groups.items(), key=lambda item: sort_keys[options["sort"]](item[1]), reverse=True)
+        self.stdout.write(f"{'count':>7} {'total (ms)':>11} {'mean (ms)':>10} {'max (ms)':>9}  query")
+        for key, durations in ranked[:options["limit"]]:
+            self.stdout.write(f"{len(durations):>7} {sum(durations):>11.1f} "
+                              f"{sum(durations) / len(durations):>10.1f} {max(durations):>9.1f}  {key}")
+            for caller, count in callers[key].most_common(3):
+                self.stdout.write(f"{'':>41}  {count} from {caller}")
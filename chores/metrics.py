@@ -0,0 +1,225 @@
+import atexit
+import datetime
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from chores import queries
+
+logger = logging.getLogger(__name__)
+
+# seconds to wait for the shared metrics file when flushing from a request, and otherwise
+FLUSH_TIMEOUT = 0.1
+READ_TIMEOUT = 5
+
+LE_LABEL = re.compile(r'(?:^|,)le="([^"]*)"')
+
+
+def format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    return ",".join('{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+                    for name, value in labels)
+
+
+def format_value(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class Metric(object):
+    type = ""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+
+    def sample_names(self) -> Sequence[str]:
+        return (self.name,)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def sample_names(self) -> Sequence[str]:
+        return (f"{self.name}_total",)
+
+    def samples(self, value: float, **labels: str) -> List[Tuple[str, str, float]]:
+        return [(f"{self.name}_total", format_labels(sorted(labels.items())), value)]
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float]):
+        super().__init__(name, help)
+        self.buckets = (*buckets, float("inf"))
+
+    def sample_names(self) -> Sequence[str]:
+        return (f"{self.name}_bucket", f"{self.name}_sum", f"{self.name}_count")
+
+    def samples(self, value: float, **labels: str) -> List[Tuple[str, str, float]]:
+        label_list = sorted(labels.items())
+        # buckets are cumulative, an observation counts towards every bucket it fits in and
+        # the others are still written so every bucket is exposed
+        samples = [(f"{self.name}_bucket", format_labels([*label_list, ("le", format_value(bucket))]),
+                    1 if value <= bucket else 0)
+                   for bucket in self.buckets]
+        samples.append((f"{self.name}_sum", format_labels(label_list), value))
+        samples.append((f"{self.name}_count", format_labels(label_list), 1))
+        return samples
+
+
+REQUEST_DURATION = Histogram(
+    "chores_request_duration_seconds", "Time spent handling a request, by view.",
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5))
+REQUEST_QUERIES = Histogram(
+    "chores_request_queries", "Number of database queries run by a request, by view.",
+    (1, 2, 3, 5, 10, 20, 50, 100))
+STATUS_DURATION = Histogram(
+    "chores_status_duration_seconds", "Time a request spent computing chore statuses, by view.",
+    (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1))
+LOGS_WRITTEN = Counter(
+    "chores_logs_written", "Number of chore logs written.")
+CHORE_STATES = Gauge(
+    "chores_chores", "Number of chores in each state.")
+
+STORED_METRICS = (REQUEST_DURATION, REQUEST_QUERIES, STATUS_DURATION, LOGS_WRITTEN)
+
+
+class MetricsStore(object):
+    # every process buffers its increments and adds them to a shared sqlite file every few
+    # seconds, so a scrape of any process sees the totals of all of them
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], float] = defaultdict(float)
+        self._flushed_at = time.monotonic()
+        self._schema_path = None
+
+    def create_schema(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(path, timeout=READ_TIMEOUT, isolation_level=None)
+        try:
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS metrics "
+                "(sample TEXT NOT NULL, labels TEXT NOT NULL, value REAL NOT NULL, PRIMARY KEY (sample, labels)) "
+                "WITHOUT ROWID")
+        finally:
+            connection.close()
+
+    def connect(self, path, timeout: float) -> sqlite3.Connection:
+        # the table and the wal mode persist in the file, so they are set up once per process
+        if self._schema_path != path:
+            self.create_schema(path)
+            self._schema_path = path
+
+        return sqlite3.connect(path, timeout=timeout, isolation_level=None)
+
+    def add(self, samples: Iterable[Tuple[str, str, float]]):
+        with self._lock:
+            for sample, labels, value in samples:
+                self._pending[sample, labels] += value
+
+        if time.monotonic() - self._flushed_at >= settings.CHOREMINDER_METRICS_FLUSH_INTERVAL:
+            # runs on the request thread, which must never wait long on or fail because of metrics
+            try:
+                self.flush(FLUSH_TIMEOUT)
+            except sqlite3.Error:
+                logger.warning("Could not write the metrics, retrying with the next flush", exc_info=True)
+
+    def flush(self, timeout: float = READ_TIMEOUT):
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(float)
+            self._flushed_at = time.monotonic()
+
+        if not pending:
+            return
+
+        try:
+            connection = self.connect(settings.CHOREMINDER_METRICS_DB, timeout)
+            try:
+                connection.execute("BEGIN IMMEDIATE")
+                connection.executemany(
+                    "INSERT INTO metrics (sample, labels, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT (sample, labels) DO UPDATE SET value = value + excluded.value",
+                    [(sample, labels, value) for (sample, labels), value in pending.items()])
+                connection.execute("COMMIT")
+            except sqlite3.Error:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                raise
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            # keep the increments for the next flush rather than losing them
+            with self._lock:
+                for key, value in pending.items():
+                    self._pending[key] += value
+            raise
+
+    def read(self) -> List[Tuple[str, str, float]]:
+        self.flush()
+        connection = self.connect(settings.CHOREMINDER_METRICS_DB, READ_TIMEOUT)
+        try:
+            return connection.execute("SELECT sample, labels, value FROM metrics").fetchall()
+        finally:
+            connection.close()
+
+
+store = MetricsStore()
+
+
+def flush_at_exit():
+    if settings.CHOREMINDER_METRICS:
+        store.flush()
+
+
+atexit.register(flush_at_exit)
+
+
+def observe_request(view: str, duration: float, query_count: int, status_duration: float):
+    store.add([
+        *REQUEST_DURATION.samples(duration, view=view),
+        *REQUEST_QUERIES.samples(query_count, view=view),
+        *STATUS_DURATION.samples(status_duration, view=view),
+    ])
+
+
+def count_logs_written(count: int):
+    if settings.CHOREMINDER_METRICS:
+        store.add(LOGS_WRITTEN.samples(count))
+
+
+def render(current_time: Optional[datetime.datetime] = None) -> str:
+    samples = store.read()
+    lines = []
+    for metric in STORED_METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        names = metric.sample_names()
+
+        # each label set lists its buckets in order, then its sum and count
+        def sort_key(sample: Tuple[str, str, float]) -> Tuple[str, int, float]:
+            name, labels, _ = sample
+            le = LE_LABEL.search(labels)
+            return LE_LABEL.sub("", labels), names.index(name), float(le.group(1)) if le else 0
+
+        for name, labels, value in sorted((sample for sample in samples if sample[0] in names), key=sort_key):
+            lines.append(f"{name}{{{labels}}} {format_value(value)}" if labels else f"{name} {format_value(value)}")
+
+    lines.append(f"# HELP {CHORE_STATES.name} {CHORE_STATES.help}")
+    lines.append(f"# TYPE {CHORE_STATES.name} {CHORE_STATES.type}")
+    for state, count in queries.query_state_counts(current_time or timezone.now()).items():
+        lines.append(f'{CHORE_STATES.name}{{state="{state}"}} {count}')
+
+    return "\n".join(lines) + "\n"
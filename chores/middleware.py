@@ -0,0 +1,106 @@
+import cProfile
+import io
+import json
+import logging
+import pstats
+import re
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+
+from chores import metrics, timing
+
+logger = logging.getLogger("chores.performance")
+
+# the timings reported on top of the total, they overlap when a template runs queries
+METRICS = ("db", "status", "template")
+
+
+class PerformanceMiddleware(object):
+
+    def __init__(self, get_response):
+        if not settings.CHOREMINDER_PERFORMANCE_TIMING:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        start = time.perf_counter()
+        with timing.collect() as timings:
+            response = self.get_response(request)
+
+        total = time.perf_counter() - start
+        durations = {name: timings.durations.get(name, 0) * 1000 for name in METRICS}
+        queries = timings.counts.get("db", 0)
+
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={durations["db"]:.3f};desc="{queries} queries"',
+            *(f"{name};dur={durations[name]:.3f}" for name in METRICS[1:]),
+            f"total;dur={total * 1000:.3f}",
+        ])
+        logger.info(json.dumps(dict(
+            method=request.method,
+            path=request.path,
+            status=response.status_code,
+            total_ms=round(total * 1000, 3),
+            db_ms=round(durations["db"], 3),
+            queries=queries,
+            status_ms=round(durations["status"], 3),
+            template_ms=round(durations["template"], 3),
+        )))
+        return response
+
+
+class MetricsMiddleware(object):
+
+    def __init__(self, get_response):
+        if not settings.CHOREMINDER_METRICS:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        start = time.perf_counter()
+        with timing.collect() as timings:
+            response = self.get_response(request)
+
+        resolver_match = request.resolver_match
+        metrics.observe_request(
+            resolver_match.view_name if resolver_match is not None else "unmatched",
+            time.perf_counter() - start,
+            timings.counts.get("db", 0),
+            timings.durations.get("status", 0))
+        return response
+
+
+class ProfilingMiddleware(object):
+
+    def __init__(self, get_response):
+        if not settings.CHOREMINDER_PROFILING:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        # the user is only loaded for requests asking for a profile
+        if "_profile" not in request.GET or not request.user.is_superuser:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        response = profiler.runcall(self.get_response, request)
+
+        profile_dir = settings.CHOREMINDER_PROFILE_DIR
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        name = re.sub(r"[^\w-]+", "-", request.path).strip("-") or "index"
+        profile_path = profile_dir / f"{timezone.now():%Y%m%dT%H%M%S%f}-{name}.prof"
+        profiler.dump_stats(profile_path)
+
+        summary = io.StringIO()
+        summary.write(f"{request.method} {request.get_full_path()} -> {response.status_code}\n")
+        summary.write(f"Saved to {profile_path}\n\n")
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative") \
+            .print_stats(settings.CHOREMINDER_PROFILE_SUMMARY_LINES)
+        return HttpResponse(summary.getvalue(), content_type="text/plain; charset=utf-8")
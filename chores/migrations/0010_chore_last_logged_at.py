@@ -0,0 +1,33 @@
+# Generated by Django 5.0.2 on 2026-10-18 11:50
+
+from django.db import migrations, models
+
+
+def backfill_last_logged_at(apps, schema_editor):
+    Chore = apps.get_model("chores", "Chore")
+    Log = apps.get_model("chores", "Log")
+
+    latest_timestamps = (
+        Log.objects.filter(chore=models.OuterRef("pk"))
+        .order_by("-timestamp")
+        .values("timestamp")[:1]
+    )
+    Chore.objects.update(last_logged_at=models.Subquery(latest_timestamps))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chores", "0009_awaydate"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chore",
+            name="last_logged_at",
+            field=models.DateTimeField(
+                blank=True, editable=False, null=True, verbose_name="Last Logged At"
+            ),
+        ),
+        migrations.RunPython(backfill_last_logged_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 5.0.2 on 2026-10-18 11:51
+
+import bisect
+import datetime
+
+from django.db import migrations, models
+
+
+# a frozen copy of chores.away_calendar.AwayCalendar as of this migration, so later
+# changes to the calendar never change what the backfill computes
+def merge_away_dates(away_dates):
+    starts, ends = [], []
+    intervals = sorted((away_date.start_date.toordinal(), away_date.end_date.toordinal())
+                       for away_date in away_dates)
+    for start, end in intervals:
+        if ends and start <= ends[-1] + 1:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+
+    return starts, ends
+
+
+def add_delta(calendar, start_time, delta_time):
+    starts, ends = calendar
+    start_ordinal = start_time.date().toordinal()
+    if bisect.bisect_left(ends, start_ordinal) == len(ends):
+        return start_time + delta_time
+
+    current = start_ordinal
+    remaining = delta_time.days
+    if remaining <= 0:
+        return start_time
+
+    index = bisect.bisect_right(ends, current)
+    while index < len(starts):
+        free_days = max(starts[index] - current - 1, 0)
+        if remaining <= free_days:
+            break
+
+        remaining -= free_days
+        current = ends[index]
+        index += 1
+
+    return start_time + datetime.timedelta(days=current + remaining - start_ordinal)
+
+
+def backfill_schedule(apps, schema_editor):
+    Chore = apps.get_model("chores", "Chore")
+    AwayDate = apps.get_model("chores", "AwayDate")
+
+    calendars = {}
+    chores = list(Chore.objects.filter(last_logged_at__isnull=False))
+    for chore in chores:
+        if chore.user_id not in calendars:
+            calendars[chore.user_id] = merge_away_dates(
+                AwayDate.objects.filter(user_id=chore.user_id)
+            )
+
+        calendar = calendars[chore.user_id]
+        chore.next_due = add_delta(calendar, chore.last_logged_at, chore.due_duration)
+        chore.next_overdue = (
+            add_delta(calendar, chore.next_due, chore.overdue_duration)
+            if chore.overdue_duration is not None
+            else None
+        )
+
+    Chore.objects.bulk_update(chores, ["next_due", "next_overdue"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chores", "0010_chore_last_logged_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chore",
+            name="next_due",
+            field=models.DateTimeField(
+                blank=True, editable=False, null=True, verbose_name="Next Due"
+            ),
+        ),
+        migrations.AddField(
+            model_name="chore",
+            name="next_overdue",
+            field=models.DateTimeField(
+                blank=True, editable=False, null=True, verbose_name="Next Overdue"
+            ),
+        ),
+        migrations.RunPython(backfill_schedule, migrations.RunPython.noop),
+    ]
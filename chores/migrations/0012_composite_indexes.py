@@ -0,0 +1,36 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chores", "0011_chore_next_due_next_overdue"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="awaydate",
+            index=models.Index(
+                fields=["user", "end_date", "start_date"],
+                name="chores_awaydate_user_end_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="chore",
+            index=models.Index(fields=["user", "id"], name="chores_chore_user_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="log",
+            index=models.Index(
+                fields=["chore", "-timestamp"], name="chores_log_chore_timestamp_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tag",
+            index=models.Index(fields=["user", "id"], name="chores_tag_user_id_idx"),
+        ),
+    ]
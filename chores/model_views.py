@@ -1,64 +1,157 @@
 import datetime
 from enum import Enum
-from typing import Generic, Optional, TypeVar
+from typing import (Dict, Generic, Iterable, List, Optional, Sequence, Tuple,
+                    TypeVar)
 
+from django.conf import settings
 from django.db.models import Model as DjangoModel
 from django.utils import timezone
 
-from chores import models
+from chores import models, numpy_backend, timing
+from chores.away_calendar import AwayCalendar
 from chores.type_helpers import UserType
 
 DjangoModelType = TypeVar("DjangoModelType", bound=DjangoModel)
 
 
-def calculate_percentage(val):
-    return round(100 * val, 2)
+# percentages are tracked in hundredths of a percent so quantization is exact
+PERCENTAGE_UNITS = 10000
+MICROSECOND = datetime.timedelta(microseconds=1)
 
 
-def add_delta_with_away_dates(user: UserType,
-                              start_time: datetime.datetime,
-                              delta_time: datetime.timedelta) -> datetime.datetime:
-    away_dates = models.AwayDate.objects.filter(
-        user=user, end_date__gte=start_time).order_by("start_date")
+def progress_step_units() -> int:
+    return max(1, round(settings.CHOREMINDER_PROGRESS_STEP * PERCENTAGE_UNITS / 100))
 
-    if len(away_dates) == 0:
-        return start_time + delta_time
 
-    result_time = start_time
-    days_to_add = delta_time.days
-    while days_to_add > 0:
-        result_time += datetime.timedelta(days=1)
-        if not any(map(lambda ad: ad.contains_date(result_time), away_dates)):
-            days_to_add -= 1
+def calculate_progress(start_time: datetime.datetime,
+                       end_time: datetime.datetime,
+                       current_time: datetime.datetime) -> Tuple[float, datetime.datetime]:
+    total = (end_time - start_time) // MICROSECOND
+    if total <= 0:
+        return 0, end_time
 
-    return result_time
+    step = progress_step_units()
+    units = (current_time - start_time) // MICROSECOND * PERCENTAGE_UNITS // total // step * step
+    # the first instant at which the quantized percentage reaches the next step
+    next_step_time = start_time + \
+        datetime.timedelta(microseconds=-(-(units + step) * total // PERCENTAGE_UNITS))
+    return units / 100, min(next_step_time, end_time)
+
+
+def add_delta_with_away_dates(user: UserType,
+                              start_time: datetime.datetime,
+                              delta_time: datetime.timedelta,
+                              calendar: Optional[AwayCalendar] = None) -> datetime.datetime:
+    if calendar is None:
+        calendar = AwayCalendar.for_user(user, since=start_time)
+
+    return calendar.add_delta(start_time, delta_time)
+
+
+def status_from_due_dates(current_time: datetime.datetime,
+                          latest_log_timestamp: datetime.datetime,
+                          next_due: datetime.datetime,
+                          next_overdue: Optional[datetime.datetime]) -> "ChoreStatus":
+    if next_due > current_time:
+        percentage, changes_at = calculate_progress(
+            latest_log_timestamp, next_due, current_time)
+        return ChoreStatus(ChoreState.COMPLETED, ChoreState.DUE, percentage, next_due, next_overdue,
+                           changes_at)
+    elif next_overdue is None:
+        return ChoreStatus(ChoreState.DUE, None, 0, next_due, next_overdue)
+    else:
+        if current_time < next_overdue:
+            percentage, changes_at = calculate_progress(
+                next_due, next_overdue, current_time)
+            return ChoreStatus(ChoreState.DUE, ChoreState.OVERDUE, percentage, next_due, next_overdue,
+                               changes_at)
+        else:
+            return ChoreStatus(ChoreState.OVERDUE, None, 0, next_due, next_overdue)
 
 
 def compute_status(user: UserType,
                    current_time: datetime.datetime,
                    latest_log_timestamp: Optional[datetime.datetime],
                    due_duration: datetime.timedelta,
-                   overdue_duration: Optional[datetime.timedelta]) -> "ChoreStatus":
+                   overdue_duration: Optional[datetime.timedelta],
+                   calendar: Optional[AwayCalendar] = None) -> "ChoreStatus":
     if latest_log_timestamp is None:
         return ChoreStatus(ChoreState.DUE, None, 0, None, None)
     else:
+        if calendar is None:
+            calendar = AwayCalendar.for_user(user, since=latest_log_timestamp)
+
         next_due = add_delta_with_away_dates(
-            user, latest_log_timestamp, due_duration)
+            user, latest_log_timestamp, due_duration, calendar)
         next_overdue = add_delta_with_away_dates(
-            user, next_due, overdue_duration) if overdue_duration is not None else None
-        if next_due > current_time:
-            percentage = calculate_percentage(
-                (current_time - latest_log_timestamp) / (next_due - latest_log_timestamp))
-            return ChoreStatus(ChoreState.COMPLETED, ChoreState.DUE, percentage, next_due, next_overdue)
-        elif next_overdue is None:
-            return ChoreStatus(ChoreState.DUE, None, 0, next_due, next_overdue)
-        else:
-            if current_time < next_overdue:
-                percentage = calculate_percentage(
-                    (current_time - next_due) / (next_overdue - next_due))
-                return ChoreStatus(ChoreState.DUE, ChoreState.OVERDUE, percentage, next_due, next_overdue)
-            else:
-                return ChoreStatus(ChoreState.OVERDUE, None, 0, next_due, next_overdue)
+            user, next_due, overdue_duration, calendar) if overdue_duration is not None else None
+        return status_from_due_dates(current_time, latest_log_timestamp, next_due, next_overdue)
+
+
+def project_due_dates(calendar: AwayCalendar,
+                      latest_log_timestamps: Sequence[datetime.datetime],
+                      due_durations: Sequence[datetime.timedelta],
+                      overdue_durations: Sequence[Optional[datetime.timedelta]]
+                      ) -> Tuple[List[datetime.datetime], List[Optional[datetime.datetime]]]:
+    next_dues = [calendar.add_delta(latest_log_timestamp, due_duration)
+                 for latest_log_timestamp, due_duration in zip(latest_log_timestamps, due_durations)]
+    next_overdues = [calendar.add_delta(next_due, overdue_duration) if overdue_duration is not None else None
+                     for next_due, overdue_duration in zip(next_dues, overdue_durations)]
+    return next_dues, next_overdues
+
+
+def project_chore_schedules(calendar: AwayCalendar,
+                            chores: Sequence[models.Chore]
+                            ) -> Tuple[List[datetime.datetime], List[Optional[datetime.datetime]]]:
+    numpy_threshold = settings.CHOREMINDER_NUMPY_STATUS_THRESHOLD
+    if numpy_backend.is_available() and numpy_threshold is not None and \
+            len(chores) >= numpy_threshold:
+        project = numpy_backend.project_due_dates
+    else:
+        project = project_due_dates
+
+    return project(calendar,
+                   [chore.last_logged_at for chore in chores],
+                   [chore.due_duration for chore in chores],
+                   [chore.overdue_duration for chore in chores])
+
+
+@timing.timed("status")
+def compute_statuses(user: UserType,
+                     chores: Sequence[models.Chore],
+                     current_time: datetime.datetime) -> Dict[int, "ChoreStatus"]:
+    if not chores:
+        return {}
+
+    statuses = {chore.id: ChoreStatus(ChoreState.DUE, None, 0, None, None)
+                for chore in chores}
+
+    logged_chores = [chore for chore in chores
+                     if chore.last_logged_at is not None]
+    if not logged_chores:
+        return statuses
+
+    calendar = AwayCalendar.for_user(
+        user, since=min(chore.last_logged_at for chore in logged_chores).date())
+    next_dues, next_overdues = project_chore_schedules(calendar, logged_chores)
+
+    for chore, next_due, next_overdue in zip(logged_chores, next_dues, next_overdues):
+        statuses[chore.id] = status_from_due_dates(
+            current_time, chore.last_logged_at, next_due, next_overdue)
+
+    return statuses
+
+
+def earliest_status_change(statuses: Iterable["ChoreStatus"]) -> Optional[datetime.datetime]:
+    return min((status.changes_at for status in statuses if status.changes_at is not None),
+               default=None)
+
+
+def scheduled_status(chore: models.Chore, current_time: datetime.datetime) -> "ChoreStatus":
+    if chore.last_logged_at is None or chore.next_due is None:
+        return ChoreStatus(ChoreState.DUE, None, 0, None, None)
+
+    return status_from_due_dates(current_time, chore.last_logged_at, chore.next_due, chore.next_overdue)
 
 
 class ChoreState(Enum):
@@ -87,12 +180,14 @@ class ChoreStatus(object):
                  next_state: Optional[ChoreState],
                  percentage: float,
                  next_due: datetime.datetime,
-                 next_overdue: Optional[datetime.datetime]):
+                 next_overdue: Optional[datetime.datetime],
+                 changes_at: Optional[datetime.datetime] = None):
         self.state = state
         self.next_state = next_state
         self.percentage = percentage
         self.next_due = next_due
         self.next_overdue = next_overdue
+        self.changes_at = changes_at
 
     def __eq__(self, other: object) -> bool:
         return (
@@ -131,11 +226,11 @@ class ModelViewBase(Generic[DjangoModelType]):
 
 class Chore(ModelViewBase[models.Chore]):
 
-    def __init__(self, chore: models.Chore):
+    def __init__(self, chore: models.Chore, status: Optional[ChoreStatus] = None):
         super().__init__(chore)
         self._fetched_latest_log = False
         self._latest_log = None
-        self._status = None
+        self._status = status
         self._tags = None
 
     @property
@@ -156,17 +251,14 @@ class Chore(ModelViewBase[models.Chore]):
             db_log = self._obj.log_set.order_by("-timestamp").first()
             if db_log is not None:
                 self._latest_log = Log(db_log)
+            self._fetched_latest_log = True
 
         return self._latest_log
 
     @property
     def status(self):
         if self._status is None:
-            self._status = compute_status(self._obj.user,
-                                          timezone.now(),
-                                          self.latest_log and self.latest_log.timestamp or None,
-                                          self._obj.due_duration,
-                                          self._obj.overdue_duration)
+            self._status = scheduled_status(self._obj, timezone.now())
 
         return self._status
 
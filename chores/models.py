@@ -15,6 +15,17 @@ class Chore(models.Model):
     tags = models.ManyToManyField(
         "Tag", blank=True)
     user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
+    last_logged_at = models.DateTimeField(
+        "Last Logged At", null=True, blank=True, editable=False)
+    next_due = models.DateTimeField(
+        "Next Due", null=True, blank=True, editable=False)
+    next_overdue = models.DateTimeField(
+        "Next Overdue", null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "id"], name="chores_chore_user_id_idx"),
+        ]
 
     def clean(self):
         errors = {}
@@ -48,6 +59,11 @@ class Log(models.Model):
     user = models.ForeignKey(
         get_user_model(), on_delete=models.SET_NULL, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["chore", "-timestamp"], name="chores_log_chore_timestamp_idx"),
+        ]
+
     def __str__(self):
         return "Log(id={}, timestamp={}, chore={}, user={})".format(
             self.id, self.timestamp, self.chore, self.user)
@@ -57,6 +73,11 @@ class Tag(models.Model):
     name = models.CharField("Name", max_length=100)
     user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "id"], name="chores_tag_user_id_idx"),
+        ]
+
     def __str__(self):
         return "Tag(name={}, user={})".format(self.name, self.user)
 
@@ -68,6 +89,11 @@ class AwayDate(models.Model):
     user = models.ForeignKey(
         get_user_model(), on_delete=models.SET_NULL, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "end_date", "start_date"], name="chores_awaydate_user_end_idx"),
+        ]
+
     def contains_date(self, date: datetime.datetime) -> bool:
         date = date.date()
         return self.start_date <= date and date <= self.end_date
@@ -0,0 +1,75 @@
+import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from chores.away_calendar import AwayCalendar
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+def is_available() -> bool:
+    return numpy is not None
+
+
+def build_busday_calendar(calendar: AwayCalendar) -> "numpy.busdaycalendar":
+    # every day of the week is a working day, away days are holidays
+    away_days = [numpy.arange(start, end + 1, dtype=numpy.int64) - EPOCH_ORDINAL
+                 for start, end in calendar.intervals]
+    holidays = numpy.concatenate(away_days) if away_days \
+        else numpy.array([], dtype=numpy.int64)
+    return numpy.busdaycalendar(weekmask="1111111", holidays=holidays.astype("datetime64[D]"))
+
+
+def add_deltas(calendar: AwayCalendar,
+               busday_calendar: "numpy.busdaycalendar",
+               start_times: Sequence[datetime.datetime],
+               delta_times: Sequence[datetime.timedelta]) -> List[datetime.datetime]:
+    count = len(start_times)
+    if count == 0:
+        return []
+
+    start_ordinals = numpy.fromiter((start_time.date().toordinal() for start_time in start_times),
+                                    dtype=numpy.int64, count=count)
+    days = numpy.fromiter((delta_time.days for delta_time in delta_times),
+                          dtype=numpy.int64, count=count)
+
+    start_days = (start_ordinals - EPOCH_ORDINAL).astype("datetime64[D]")
+    # rolling an away start date backward makes the offset count only the days after it
+    offset_days = numpy.busday_offset(start_days, numpy.maximum(days, 0),
+                                      roll="backward", busdaycal=busday_calendar)
+    shifts = numpy.where(days > 0, (offset_days - start_days).astype(numpy.int64), 0)
+
+    # mirror AwayCalendar.add_delta: with no away dates ahead the delta is added as is
+    last_end = calendar.intervals[-1][1] if len(calendar) else None
+    unaffected = start_ordinals > last_end if last_end is not None \
+        else numpy.ones(count, dtype=bool)
+
+    return [start_time + delta_time if is_unaffected else start_time + datetime.timedelta(days=int(shift))
+            for start_time, delta_time, is_unaffected, shift
+            in zip(start_times, delta_times, unaffected.tolist(), shifts.tolist())]
+
+
+def project_due_dates(calendar: AwayCalendar,
+                      latest_log_timestamps: Sequence[datetime.datetime],
+                      due_durations: Sequence[datetime.timedelta],
+                      overdue_durations: Sequence[Optional[datetime.timedelta]]
+                      ) -> Tuple[List[datetime.datetime], List[Optional[datetime.datetime]]]:
+    busday_calendar = build_busday_calendar(calendar)
+    next_dues = add_deltas(calendar, busday_calendar,
+                           latest_log_timestamps, due_durations)
+
+    overdue_indexes = [index for index, overdue_duration in enumerate(overdue_durations)
+                       if overdue_duration is not None]
+    projected_overdues = add_deltas(calendar, busday_calendar,
+                                    [next_dues[index] for index in overdue_indexes],
+                                    [overdue_durations[index] for index in overdue_indexes])
+
+    next_overdues: List[Optional[datetime.datetime]] = [None] * len(next_dues)
+    for index, next_overdue in zip(overdue_indexes, projected_overdues):
+        next_overdues[index] = next_overdue
+
+    return next_dues, next_overdues
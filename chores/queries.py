@@ -1,10 +1,56 @@
-from typing import List
+import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
-from chores import model_views, models
+from django.db.models import (BigIntegerField, Case, Count, DateTimeField,
+                              DurationField, ExpressionWrapper, F, FloatField,
+                              Min, Q, QuerySet, Value, When)
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+from chores import model_views, models, timing
 from chores.type_helpers import UserType
 
 
-def query_chores(user: UserType, tag_id: int | None) -> List[model_views.Chore]:
+def quantized_percentage(elapsed: ExpressionWrapper, total: ExpressionWrapper) -> Coalesce:
+    # integer division mirrors model_views.calculate_progress exactly
+    step = model_views.progress_step_units()
+    units = ExpressionWrapper(
+        Cast(elapsed, BigIntegerField()) * model_views.PERCENTAGE_UNITS / Cast(total, BigIntegerField())
+        / step * step,
+        output_field=BigIntegerField())
+    return Coalesce(Cast(units, FloatField()) / 100.0, 0.0, output_field=FloatField())
+
+
+def annotate_status(queryset: QuerySet, current_time: datetime.datetime) -> QuerySet:
+    # mirrors model_views.status_from_due_dates so chores can be grouped and ordered in SQL
+    now = Value(current_time, output_field=DateTimeField())
+    due = Value(model_views.ChoreState.DUE.value)
+
+    return queryset.annotate(
+        state=Case(
+            When(next_due__isnull=True, then=due),
+            When(next_due__gt=now, then=Value(model_views.ChoreState.COMPLETED.value)),
+            When(next_overdue__lte=now, then=Value(model_views.ChoreState.OVERDUE.value)),
+            default=due),
+        percentage=Case(
+            When(next_due__isnull=True, then=Value(0.0)),
+            When(next_due__gt=now, then=quantized_percentage(
+                ExpressionWrapper(now - F("last_logged_at"), output_field=DurationField()),
+                ExpressionWrapper(F("next_due") - F("last_logged_at"), output_field=DurationField()))),
+            When(next_overdue__gt=now, then=quantized_percentage(
+                ExpressionWrapper(now - F("next_due"), output_field=DurationField()),
+                ExpressionWrapper(F("next_overdue") - F("next_due"), output_field=DurationField()))),
+            default=Value(0.0),
+            output_field=FloatField()),
+        weight=F("percentage") + Case(
+            When(state=model_views.ChoreState.DUE.value, then=Value(100.0)),
+            When(state=model_views.ChoreState.OVERDUE.value, then=Value(200.0)),
+            default=Value(0.0),
+            output_field=FloatField()),
+    )
+
+
+def filter_chores(user: UserType, tag_id: int | None) -> QuerySet:
     if user is None:
         raise ValueError("Invalid user provided")
 
@@ -12,7 +58,60 @@ def query_chores(user: UserType, tag_id: int | None) -> List[model_views.Chore]:
     if tag_id is not None:
         filter_args["tags__id"] = tag_id
 
-    return list(map(model_views.Chore, models.Chore.objects.filter(**filter_args).order_by("id")))
+    return models.Chore.objects.filter(**filter_args)
+
+
+def query_chores(user: UserType, tag_id: int | None) -> List[model_views.Chore]:
+    current_time = timezone.now()
+    return list_chores(annotate_status(filter_chores(user, tag_id), current_time), current_time)
+
+
+def list_chores(chores: QuerySet,
+                current_time: datetime.datetime,
+                limit: Optional[int] = None) -> List[model_views.Chore]:
+    chores = list(chores.prefetch_related("tags").order_by("-weight", "id")[:limit])
+    with timing.measure("status"):
+        return [model_views.Chore(chore, model_views.scheduled_status(chore, current_time))
+                for chore in chores]
+
+
+def query_pending_chores(user: UserType,
+                         tag_id: int | None,
+                         current_time: datetime.datetime) -> List[model_views.Chore]:
+    chores = annotate_status(filter_chores(user, tag_id), current_time) \
+        .exclude(state=model_views.ChoreState.COMPLETED.value)
+    return list_chores(chores, current_time)
+
+
+def query_completed_chores(user: UserType,
+                           tag_id: int | None,
+                           current_time: datetime.datetime,
+                           after: Optional[Tuple[float, int]],
+                           limit: Optional[int]) -> List[model_views.Chore]:
+    # keyset pagination following the list order of -weight, id
+    chores = annotate_status(filter_chores(user, tag_id), current_time) \
+        .filter(state=model_views.ChoreState.COMPLETED.value)
+    if after is not None:
+        weight, chore_id = after
+        chores = chores.filter(Q(weight__lt=weight) | Q(weight=weight, id__gt=chore_id))
+
+    return list_chores(chores, current_time, limit)
+
+
+def query_group_summary(user: UserType,
+                        tag_id: int | None,
+                        current_time: datetime.datetime) -> Dict[str, Any]:
+    completed = Q(state=model_views.ChoreState.COMPLETED.value)
+    return annotate_status(filter_chores(user, tag_id), current_time).aggregate(
+        Pending=Count("id", filter=~completed),
+        Completed=Count("id", filter=completed),
+        completed_changes_at=Min("next_due", filter=completed))
+
+
+def query_state_counts(current_time: datetime.datetime) -> Dict[str, int]:
+    # totals across every user, for the metrics endpoint
+    return annotate_status(models.Chore.objects.all(), current_time).aggregate(**{
+        state.name.lower(): Count("id", filter=Q(state=state.value)) for state in model_views.ChoreState})
 
 
 def query_tags(user: UserType) -> List[model_views.Tag]:
@@ -27,3 +126,22 @@ def query_away_dates(user: UserType) -> List[model_views.AwayDate]:
         raise ValueError("Invalid user provided")
 
     return list(map(model_views.AwayDate, models.AwayDate.objects.filter(user=user).order_by("id")))
+
+
+def chore_logs(chore: models.Chore) -> QuerySet:
+    # newest first with ties by ascending id, the exact order of the (chore, -timestamp) index
+    return (models.Log.objects
+            .filter(chore=chore)
+            .order_by("-timestamp", "id")
+            .values("id", "timestamp", username=F("user__username")))
+
+
+def query_chore_logs(chore: models.Chore,
+                     after: Optional[Tuple[datetime.datetime, int]],
+                     limit: int) -> List[Dict[str, Any]]:
+    logs = chore_logs(chore)
+    if after is not None:
+        timestamp, log_id = after
+        logs = logs.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__gt=log_id))
+
+    return list(logs[:limit])
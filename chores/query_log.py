@@ -0,0 +1,114 @@
+import datetime
+import json
+import logging
+import os
+import re
+import sys
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from django.conf import settings
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+logger = logging.getLogger("chores.slow_queries")
+
+# frames of the query instrumentation itself are never reported as the caller
+INSTRUMENTATION_MODULES = {__name__, "chores.timing"}
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    # queries differing only in their literals or the length of an IN list share a fingerprint
+    sql = STRING_LITERAL.sub("?", sql)
+    sql = NUMBER_LITERAL.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = PLACEHOLDER_LIST.sub("(...)", sql)
+    return WHITESPACE.sub(" ", sql).strip()
+
+
+def params_shape(params: Any, many: bool) -> Any:
+    # only the types are kept so no user data ends up in the log
+    if params is None:
+        return None
+
+    if many:
+        rows = list(params) if not isinstance(params, Sequence) else params
+        return dict(rows=len(rows), row=params_shape(rows[0], False) if rows else None)
+
+    if isinstance(params, dict):
+        return {key: type(value).__name__ for key, value in params.items()}
+
+    return [type(value).__name__ for value in params]
+
+
+def find_caller() -> Optional[str]:
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("chores.") and module not in INSTRUMENTATION_MODULES:
+            return f"{module}:{frame.f_lineno} in {frame.f_code.co_name}"
+
+        frame = frame.f_back
+
+    return None
+
+
+def log_slow_queries(execute, sql, params, many, context):
+    threshold = settings.CHOREMINDER_SLOW_QUERY_THRESHOLD
+    if threshold is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        if duration >= threshold:
+            logger.warning(json.dumps(dict(
+                time=datetime.datetime.now(tz=datetime.timezone.utc).isoformat(),
+                duration_ms=round(duration * 1000, 3),
+                sql=sql,
+                params=params_shape(params, many),
+                many=many,
+                caller=find_caller(),
+            )))
+
+
+def install_query_logger(sender: Any, connection: BaseDatabaseWrapper, **kwargs: Any):
+    # the wrapper list outlives reconnects of the same connection object
+    if log_slow_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(log_slow_queries)
+
+
+def process_log_path(path: str | os.PathLike, pid: int | str) -> Path:
+    path = Path(path)
+    return path.with_name(f"{path.stem}.{pid}{path.suffix}")
+
+
+class ProcessRotatingFileHandler(RotatingFileHandler):
+    # rotating one file from several uwsgi processes renames it under the others, so every
+    # process writes and rotates its own file next to CHOREMINDER_SLOW_QUERY_LOG. The path is
+    # resolved when writing, as uwsgi forks its workers after logging is configured.
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(self.current_path(), delay=True, **kwargs)
+
+    def current_path(self) -> str:
+        return os.path.abspath(process_log_path(settings.CHOREMINDER_SLOW_QUERY_LOG, os.getpid()))
+
+    def emit(self, record: logging.LogRecord):
+        path = self.current_path()
+        if path != self.baseFilename:
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+
+            self.baseFilename = path
+
+        super().emit(record)
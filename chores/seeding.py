@@ -0,0 +1,181 @@
+import datetime
+import random
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+
+from chores import actions, models
+
+BATCH_SIZE = 1000
+TRANSACTION_SIZE = 100_000
+
+# due durations in days and how common they are, weekly chores being the most frequent
+DUE_DAYS = (1, 2, 3, 7, 14, 30, 90)
+DUE_WEIGHTS = (20, 10, 10, 30, 15, 10, 5)
+
+
+def batches(items: Iterable, size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def random_due_duration(rng: random.Random) -> datetime.timedelta:
+    return datetime.timedelta(days=rng.choices(DUE_DAYS, DUE_WEIGHTS)[0])
+
+
+def random_overdue_duration(rng: random.Random, due_duration: datetime.timedelta) -> Optional[datetime.timedelta]:
+    if rng.random() < 0.3:
+        return None
+
+    return datetime.timedelta(days=max(1, round(due_duration.days * rng.uniform(0.2, 1))))
+
+
+def generate_away_dates(rng: random.Random,
+                        user,
+                        count: int,
+                        since: datetime.date,
+                        today: datetime.date) -> Iterator[models.AwayDate]:
+    span = (today - since).days + 30
+    previous = None
+    for index in range(count):
+        # some trips start during the previous one so overlapping ranges are covered
+        if previous is not None and rng.random() < 0.25:
+            start_date = previous.start_date + datetime.timedelta(
+                days=rng.randrange((previous.end_date - previous.start_date).days + 1))
+        else:
+            start_date = since + datetime.timedelta(days=rng.randrange(span))
+
+        previous = models.AwayDate(name=f"Away {index}",
+                                   start_date=start_date,
+                                   end_date=start_date + datetime.timedelta(days=rng.randrange(14)),
+                                   user=user)
+        yield previous
+
+
+def generate_chores(rng: random.Random, user, count: int) -> Iterator[models.Chore]:
+    for index in range(count):
+        due_duration = random_due_duration(rng)
+        yield models.Chore(name=f"Chore {index}",
+                           description=f"Generated chore {index}",
+                           due_duration=due_duration,
+                           overdue_duration=random_overdue_duration(rng, due_duration),
+                           user=user)
+
+
+def generate_logs(rng: random.Random,
+                  chores: Iterable[models.Chore],
+                  now: datetime.datetime,
+                  logs_per_chore: Optional[int] = None,
+                  since: Optional[datetime.datetime] = None) -> Iterator[Tuple[datetime.datetime, int, int]]:
+    # logs walk back from now, each one done somewhat early or late against the due duration
+    for chore in chores:
+        timestamp = now - datetime.timedelta(hours=rng.randrange(48))
+        count = 0
+        while (logs_per_chore is None or count < logs_per_chore) and (since is None or timestamp >= since):
+            yield timestamp, chore.id, chore.user_id
+            timestamp -= chore.due_duration * rng.uniform(0.75, 1.5)
+            count += 1
+
+
+def insert_logs(logs: Iterable[Tuple[datetime.datetime, int, int]], batch_size: int, transaction_size: int) -> int:
+    # plain executemany, building and preparing a model instance per row costs several times the insert
+    quote_name = connection.ops.quote_name
+    columns = ", ".join(quote_name(models.Log._meta.get_field(name).column)
+                        for name in ("timestamp", "chore", "user"))
+    sql = f"INSERT INTO {quote_name(models.Log._meta.db_table)} ({columns}) VALUES (%s, %s, %s)"
+    adapt_timestamp = connection.ops.adapt_datetimefield_value
+
+    # a transaction is committed every transaction_size rows so neither memory nor the wal grow unbounded
+    total = 0
+    log_batches = batches(logs, batch_size)
+    written = transaction_size
+    while written >= transaction_size:
+        written = 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            for batch in log_batches:
+                cursor.executemany(sql, [(adapt_timestamp(timestamp), chore_id, user_id)
+                                         for timestamp, chore_id, user_id in batch])
+                written += len(batch)
+                if written >= transaction_size:
+                    break
+
+        total += written
+
+    return total
+
+
+def seed_user(rng: random.Random,
+              user,
+              chores: int,
+              logs_per_chore: Optional[int],
+              years: Optional[float],
+              away_dates: int,
+              tags: int,
+              now: datetime.datetime,
+              batch_size: int,
+              transaction_size: int) -> int:
+    since = now - datetime.timedelta(days=round(365 * years)) if years is not None else None
+    with transaction.atomic():
+        tag_objects = models.Tag.objects.bulk_create(
+            [models.Tag(name=f"Tag {index}", user=user) for index in range(tags)])
+        models.AwayDate.objects.bulk_create(generate_away_dates(
+            rng, user, away_dates, (since or now - datetime.timedelta(days=365)).date(), now.date()),
+            batch_size=batch_size)
+        chore_objects = models.Chore.objects.bulk_create(
+            generate_chores(rng, user, chores), batch_size=batch_size)
+
+        through = models.Chore.tags.through
+        through.objects.bulk_create([
+            through(chore_id=chore.id, tag_id=tag.id)
+            for chore in chore_objects
+            for tag in rng.sample(tag_objects, min(len(tag_objects), rng.randrange(3)))
+        ], batch_size=batch_size)
+
+    log_count = insert_logs(generate_logs(rng, chore_objects, now, logs_per_chore, since),
+                            batch_size, transaction_size)
+
+    # bulk_create skips the signals that keep the denormalized chore columns up to date
+    with transaction.atomic():
+        user_chores = models.Chore.objects.filter(user=user)
+        actions.refresh_last_logged_at(user_chores.values("pk"))
+        actions.refresh_schedules(user_chores.filter(last_logged_at__isnull=False))
+
+    return log_count
+
+
+def seed_dataset(users: int = 1,
+                 chores: int = 50,
+                 logs_per_chore: Optional[int] = 10,
+                 years: Optional[float] = None,
+                 away_dates: int = 5,
+                 tags: int = 5,
+                 seed: int = 0,
+                 username_prefix: str = "benchmark",
+                 now: Optional[datetime.datetime] = None,
+                 batch_size: int = BATCH_SIZE,
+                 transaction_size: int = TRANSACTION_SIZE,
+                 progress: Optional[Callable[[object, int], None]] = None) -> List:
+    if logs_per_chore is None and years is None:
+        raise ValueError("Either logs_per_chore or years has to bound the log history")
+
+    rng = random.Random(seed)
+    now = now or timezone.now()
+    user_objects = []
+    for index in range(users):
+        user = get_user_model().objects.create(username=f"{username_prefix}-{index}")
+        log_count = seed_user(rng, user, chores, logs_per_chore, years, away_dates, tags, now,
+                              batch_size, transaction_size)
+        user_objects.append(user)
+        if progress is not None:
+            progress(user, log_count)
+
+    return user_objects
@@ -0,0 +1,122 @@
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from chores import actions, caching, models
+
+
+@receiver(pre_save, sender=models.Log)
+def remember_previous_chore(sender, instance: models.Log, raw=False, **kwargs):
+    instance._previous_chore_id = None
+    if instance.pk is not None and not raw:
+        instance._previous_chore_id = (models.Log.objects
+                                       .filter(pk=instance.pk)
+                                       .values_list("chore_id", flat=True)
+                                       .first())
+
+
+@receiver(post_save, sender=models.Log)
+def log_saved(sender, instance: models.Log, raw=False, **kwargs):
+    if raw:
+        return
+
+    chore_ids = {instance.chore_id}
+    previous_chore_id = getattr(instance, "_previous_chore_id", None)
+    if previous_chore_id is not None:
+        chore_ids.add(previous_chore_id)
+
+    refreshed_chores = actions.refresh_logged_chores(chore_ids)
+    caching.bump_data_versions(chore.user_id for chore in refreshed_chores)
+
+
+def is_cascade_from(origin, *origin_models) -> bool:
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return issubclass(origin_model, origin_models)
+
+
+@receiver(post_delete, sender=models.Log)
+def log_deleted(sender, instance: models.Log, origin=None, **kwargs):
+    # the logs of a deleted chore or user go with the chore, which needs no refresh
+    if is_cascade_from(origin, models.Chore, get_user_model()):
+        return
+
+    # every log of a delete is gone before the first signal, so each chore is refreshed once
+    refreshed_chore_ids = origin.__dict__.setdefault("_refreshed_chore_ids", set()) \
+        if origin is not None else set()
+    if instance.chore_id in refreshed_chore_ids:
+        return
+
+    refreshed_chore_ids.add(instance.chore_id)
+    refreshed_chores = actions.refresh_logged_chores((instance.chore_id,))
+    caching.bump_data_versions(chore.user_id for chore in refreshed_chores)
+
+
+@receiver(pre_save, sender=models.Chore)
+def schedule_chore(sender, instance: models.Chore, raw=False, update_fields=None, **kwargs):
+    if raw or update_fields is not None:
+        return
+
+    # the denormalized columns are maintained by log writes, never by stale instances
+    if instance.pk is not None:
+        instance.last_logged_at = (models.Chore.objects
+                                   .filter(pk=instance.pk)
+                                   .values_list("last_logged_at", flat=True)
+                                   .first())
+
+    actions.schedule_chores((instance,))
+
+
+@receiver(post_save, sender=models.Chore)
+@receiver(post_delete, sender=models.Chore)
+def chore_changed(sender, instance: models.Chore, **kwargs):
+    caching.bump_data_version(instance.user_id)
+
+
+@receiver(m2m_changed, sender=models.Chore.tags.through)
+def chore_tags_changed(sender, instance, action: str, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        caching.bump_data_version(instance.user_id)
+
+
+@receiver(post_save, sender=models.Tag)
+@receiver(post_delete, sender=models.Tag)
+def tag_changed(sender, instance: models.Tag, **kwargs):
+    caching.bump_data_version(instance.user_id)
+
+
+@receiver(pre_save, sender=models.AwayDate)
+def remember_previous_away_date(sender, instance: models.AwayDate, raw=False, **kwargs):
+    instance._previous_away_date = None
+    if instance.pk is not None and not raw:
+        instance._previous_away_date = (models.AwayDate.objects
+                                        .filter(pk=instance.pk)
+                                        .values("user_id", "start_date", "end_date")
+                                        .first())
+
+
+@receiver(post_save, sender=models.AwayDate)
+def away_date_saved(sender, instance: models.AwayDate, raw=False, **kwargs):
+    if raw:
+        return
+
+    previous = getattr(instance, "_previous_away_date", None)
+    previous_user_id = previous["user_id"] if previous is not None else None
+    if previous_user_id is not None:
+        actions.refresh_away_date_ranges(
+            previous_user_id, ((previous["start_date"], previous["end_date"]),))
+
+    if instance.user_id is not None:
+        actions.refresh_away_date_ranges(
+            instance.user_id, ((instance.start_date, instance.end_date),))
+
+    caching.bump_data_versions((previous_user_id, instance.user_id))
+
+
+@receiver(post_delete, sender=models.AwayDate)
+def away_date_deleted(sender, instance: models.AwayDate, **kwargs):
+    if instance.user_id is not None:
+        actions.refresh_away_date_ranges(
+            instance.user_id, ((instance.start_date, instance.end_date),))
+        caching.bump_data_version(instance.user_id)
@@ -0,0 +1,17 @@
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+
+def pragma_statements(pragmas: Dict[str, Any]) -> List[str]:
+    return [f"PRAGMA {name} = {value}" for name, value in pragmas.items()]
+
+
+def apply_pragmas(sender: Any, connection: BaseDatabaseWrapper, **kwargs: Any):
+    if connection.vendor != "sqlite":
+        return
+
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(settings.CHOREMINDER_SQLITE_PRAGMAS):
+            cursor.execute(statement)
@@ -0,0 +1,102 @@
+import datetime
+import random
+from datetime import timedelta as td
+
+from django.test import TestCase
+from django.utils import timezone
+
+from chores import models
+from chores.away_calendar import AwayCalendar
+
+from .utils import create_away_date, create_random_user
+
+
+def build_away_date(start_date: datetime.date, end_date: datetime.date) -> models.AwayDate:
+    return models.AwayDate(name="away", start_date=start_date, end_date=end_date)
+
+
+def add_delta_day_by_day(away_dates, start_time: datetime.datetime, delta_time: datetime.timedelta):
+    # reference implementation: the original loop over every day and every away date
+    away_dates = [away_date for away_date in away_dates
+                  if away_date.end_date >= start_time.date()]
+
+    if len(away_dates) == 0:
+        return start_time + delta_time
+
+    result_time = start_time
+    days_to_add = delta_time.days
+    while days_to_add > 0:
+        result_time += datetime.timedelta(days=1)
+        if not any(map(lambda ad: ad.contains_date(result_time), away_dates)):
+            days_to_add -= 1
+
+    return result_time
+
+
+class TestAwayCalendar(TestCase):
+
+    def test_merges_overlapping_and_adjacent_ranges(self):
+        today = timezone.now().date()
+        calendar = AwayCalendar([
+            build_away_date(today + td(days=5), today + td(days=6)),
+            build_away_date(today, today + td(days=2)),
+            build_away_date(today + td(days=1), today + td(days=3)),
+            build_away_date(today + td(days=4), today + td(days=4)),
+            build_away_date(today + td(days=10), today + td(days=10)),
+        ])
+
+        self.assertEqual(len(calendar), 2)
+
+    def test_is_away(self):
+        today = timezone.now().date()
+        calendar = AwayCalendar([
+            build_away_date(today, today + td(days=1)),
+            build_away_date(today + td(days=3), today + td(days=3)),
+        ])
+
+        self.assertFalse(calendar.is_away(today - td(days=1)))
+        self.assertTrue(calendar.is_away(today))
+        self.assertTrue(calendar.is_away(today + td(days=1)))
+        self.assertFalse(calendar.is_away(today + td(days=2)))
+        self.assertTrue(calendar.is_away(today + td(days=3)))
+        self.assertFalse(calendar.is_away(today + td(days=4)))
+
+    def test_empty_keeps_time_of_day_delta(self):
+        now = timezone.now()
+        self.assertEqual(AwayCalendar([]).add_delta(
+            now, td(days=1, hours=2)), now + td(days=1, hours=2))
+
+    def test_for_user(self):
+        user1 = create_random_user()
+        user2 = create_random_user()
+        now = timezone.now()
+        create_away_date(user1, now.date() - td(days=10),
+                         now.date() - td(days=8))
+        create_away_date(user1, now.date() + td(days=1),
+                         now.date() + td(days=2))
+        create_away_date(user2, now.date() + td(days=1),
+                         now.date() + td(days=5))
+
+        self.assertEqual(len(AwayCalendar.for_user(user1)), 2)
+        self.assertEqual(len(AwayCalendar.for_user(user1, since=now)), 1)
+        self.assertEqual(AwayCalendar.for_user(user1, since=now).add_delta(
+            now, td(days=2)), now + td(days=4))
+
+    def test_matches_day_by_day_loop(self):
+        rng = random.Random(2442)
+        base_time = timezone.now()
+
+        for _ in range(300):
+            away_dates = []
+            for _ in range(rng.randint(0, 12)):
+                start_date = (base_time + td(days=rng.randint(-30, 400))).date()
+                end_date = start_date + td(days=rng.randint(0, 20))
+                away_dates.append(build_away_date(start_date, end_date))
+
+            calendar = AwayCalendar(away_dates)
+            start_time = base_time + td(days=rng.randint(-10, 60),
+                                        hours=rng.randint(0, 23))
+            delta_time = td(days=rng.choice((0, 1, 2, 7, 30, 365)))
+
+            self.assertEqual(calendar.add_delta(start_time, delta_time),
+                             add_delta_day_by_day(away_dates, start_time, delta_time))
@@ -0,0 +1,42 @@
+import logging
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from chores import benchmarking
+
+
+class TestThrowawayDatabase(TransactionTestCase):
+
+    @override_settings(CHOREMINDER_METRICS=True)
+    def test_isolated_from_real_data(self):
+        cache.set("chores:test", "real")
+        slow_query_log = settings.CHOREMINDER_SLOW_QUERY_LOG
+        slow_query_handlers = logging.getLogger("chores.slow_queries").handlers[:]
+
+        with benchmarking.throwaway_database():
+            self.assertIsNone(cache.get("chores:test"))
+            cache.set("chores:test", "benchmark")
+            self.assertFalse(settings.CHOREMINDER_METRICS)
+            self.assertNotEqual(settings.CHOREMINDER_SLOW_QUERY_LOG, slow_query_log)
+
+            logging.getLogger("chores.slow_queries").warning("benchmark")
+            with open(settings.CHOREMINDER_SLOW_QUERY_LOG, encoding="utf-8") as input:
+                self.assertEqual(input.read(), "benchmark\n")
+            temporary_log = settings.CHOREMINDER_SLOW_QUERY_LOG
+
+        self.assertEqual(cache.get("chores:test"), "real")
+        self.assertTrue(settings.CHOREMINDER_METRICS)
+        self.assertEqual(logging.getLogger("chores.slow_queries").handlers, slow_query_handlers)
+        self.assertFalse(os.path.exists(temporary_log))
+
+
+class TestPercentile(TestCase):
+
+    def test_nearest_rank(self):
+        values = [5, 1, 4, 2, 3]
+        self.assertEqual(benchmarking.percentile(values, 50), 3)
+        self.assertEqual(benchmarking.percentile(values, 99), 5)
+        self.assertEqual(benchmarking.percentile(values, 0), 1)
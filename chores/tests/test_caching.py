@@ -0,0 +1,125 @@
+import tempfile
+from datetime import timedelta as td
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from chores import caching
+
+from .utils import (create_away_date, create_chore, create_log,
+                    create_random_user, create_tag)
+
+
+class TestDataVersion(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.user = create_random_user()
+
+    def assertBumps(self, func):
+        version = caching.get_data_version(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            result = func()
+            self.assertEqual(caching.get_data_version(self.user.id), version)
+
+        self.assertNotEqual(caching.get_data_version(self.user.id), version)
+        return result
+
+    def test_stable_without_writes(self):
+        self.assertEqual(caching.get_data_version(self.user.id),
+                         caching.get_data_version(self.user.id))
+
+    def test_bumped_by_writes(self):
+        chore = self.assertBumps(lambda: create_chore(self.user))
+        tag = self.assertBumps(lambda: create_tag(self.user))
+        self.assertBumps(lambda: chore.tags.add(tag))
+        log = self.assertBumps(lambda: create_log(
+            timezone.now(), chore, self.user))
+        self.assertBumps(log.delete)
+        away_date = self.assertBumps(lambda: create_away_date(self.user))
+        self.assertBumps(away_date.delete)
+        self.assertBumps(tag.delete)
+        self.assertBumps(chore.delete)
+
+    def test_bumped_after_commit(self):
+        version = caching.get_data_version(self.user.id)
+        with self.captureOnCommitCallbacks() as callbacks:
+            create_chore(self.user)
+
+        # readers keep the old version until the write is visible to them
+        self.assertEqual(caching.get_data_version(self.user.id), version)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(caching.get_data_version(self.user.id), version)
+
+    def test_other_users_unaffected(self):
+        version = caching.get_data_version(self.user.id)
+        create_chore(create_random_user())
+        self.assertEqual(caching.get_data_version(self.user.id), version)
+
+
+class TestGetChoreList(TestCase):
+
+    def build(self, html="<div></div>"):
+        return mock.Mock(return_value=caching.CachedChoreList(html))
+
+    def check_backend(self):
+        user = create_random_user()
+        build = self.build()
+
+        first = caching.get_chore_list(user.id, None, build)
+        second = caching.get_chore_list(user.id, None, build)
+        self.assertEqual(first.html, second.html)
+        build.assert_called_once()
+
+        # tag filters are cached separately
+        caching.get_chore_list(user.id, 1, build)
+        self.assertEqual(build.call_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            caching.bump_data_version(user.id)
+        caching.get_chore_list(user.id, None, build)
+        self.assertEqual(build.call_count, 3)
+
+    def test_rebuilt_after_expiry(self):
+        cache.clear()
+        user = create_random_user()
+        now = timezone.now()
+
+        expired = mock.Mock(return_value=caching.CachedChoreList(
+            "", now - td(seconds=1)))
+        caching.get_chore_list(user.id, None, expired)
+        caching.get_chore_list(user.id, None, expired)
+        self.assertEqual(expired.call_count, 2)
+
+        current = mock.Mock(return_value=caching.CachedChoreList(
+            "", now + td(hours=1)))
+        caching.get_chore_list(user.id, None, current)
+        caching.get_chore_list(user.id, None, current)
+        current.assert_called_once()
+
+    def test_timeout(self):
+        now = timezone.now()
+        self.assertEqual(caching.CachedChoreList(
+            "", now + td(seconds=90, microseconds=1)).timeout(now), 91)
+
+        with override_settings(CHOREMINDER_CHORE_LIST_CACHE_TIMEOUT=60):
+            self.assertEqual(caching.CachedChoreList(
+                "", now + td(hours=2)).timeout(now), 60)
+            self.assertEqual(caching.CachedChoreList(
+                "").timeout(now), 60)
+
+    def test_locmem(self):
+        cache.clear()
+        self.check_backend()
+
+    def test_file_based(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with override_settings(CACHES={"default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": cache_dir,
+            }}):
+                self.check_backend()
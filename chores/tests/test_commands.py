@@ -0,0 +1,268 @@
+import json
+import os
+import tempfile
+from datetime import timedelta as td
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import Client, TestCase, TransactionTestCase
+from django.utils import timezone
+
+from chores import models
+from chores.management.commands import benchmark
+
+from .utils import (create_away_date, create_chore, create_log,
+                    create_random_user, create_tag, get_user)
+
+
+class TestRebuildLastLoggedAt(TestCase):
+
+    def test_rebuilds(self):
+        user = get_user()
+        chore1 = create_chore(user)
+        chore2 = create_chore(user)
+        now = timezone.now()
+        create_log(now, chore1, user)
+        models.Chore.objects.update(
+            last_logged_at=None, next_due=None, next_overdue=None)
+
+        out = StringIO()
+        call_command("rebuild_last_logged_at", stdout=out)
+        self.assertIn("2 chores", out.getvalue())
+
+        chore1.refresh_from_db()
+        chore2.refresh_from_db()
+        self.assertEqual(chore1.last_logged_at, now)
+        self.assertEqual(chore1.next_due, now + td(days=1))
+        self.assertEqual(chore1.next_overdue, now + td(days=2))
+        self.assertIsNone(chore2.last_logged_at)
+        self.assertIsNone(chore2.next_due)
+
+
+class TestBenchmarkSqlite(TestCase):
+
+    def test_reports_profiles(self):
+        out = StringIO()
+        call_command("benchmark_sqlite", duration=0.2, chores=20, stdout=out)
+        self.assertIn("default", out.getvalue())
+        self.assertIn("configured", out.getvalue())
+        self.assertIn("reads:", out.getvalue())
+
+
+class TestBenchmarkConnections(TransactionTestCase):
+
+    def test_reports_profiles(self):
+        out = StringIO()
+        call_command("benchmark_connections", requests=3, chores=2, stdout=out)
+        self.assertIn("per request", out.getvalue())
+        self.assertIn("persistent", out.getvalue())
+        self.assertIn("saved per request", out.getvalue())
+        self.assertFalse(models.Log.objects.exists())
+
+
+class TestExportImportChores(TestCase):
+
+    def setUp(self):
+        self.user = get_user()
+        self.tag = create_tag(self.user)
+        self.chore = create_chore(self.user, self.tag)
+        self.untagged_chore = create_chore(self.user)
+        self.away_date = create_away_date(self.user)
+        self.now = timezone.now()
+        create_log(self.now - td(days=1), self.chore, self.user)
+        create_log(self.now, self.chore, self.user)
+        create_chore(create_random_user())
+
+    def export(self, format):
+        out = StringIO()
+        call_command("export_chores", user=self.user.username, format=format, stdout=out)
+        return out.getvalue()
+
+    def import_(self, data, format, user, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, f"export.{format}")
+            with open(path, "w", newline="", encoding="utf-8") as output:
+                output.write(data)
+
+            out = StringIO()
+            call_command("import_chores", path, user=user.username, format=format,
+                         stdout=out, **{"batch_size": 1, **options})
+            return out.getvalue()
+
+    def test_exports_jsonl(self):
+        records = [json.loads(line) for line in self.export("jsonl").splitlines()]
+        self.assertEqual([record["type"] for record in records],
+                         ["tag", "away_date", "chore", "chore", "chore_tag", "log", "log"])
+        self.assertEqual(records[2]["due_duration"], "P1DT00H00M00S")
+        self.assertEqual(records[4], dict(type="chore_tag", chore=self.chore.id, tag=self.tag.id))
+        self.assertEqual(records[6]["timestamp"], self.now.isoformat())
+
+    def test_round_trips(self):
+        for format in ("jsonl", "csv"):
+            with self.subTest(format=format):
+                user = create_random_user()
+                out = self.import_(self.export(format), format, user)
+                self.assertIn("2 chore records", out)
+                self.assertIn("2 log records", out)
+
+                chore = models.Chore.objects.get(user=user, name=self.chore.name)
+                self.assertNotEqual(chore.id, self.chore.id)
+                self.assertEqual(chore.description, self.chore.description)
+                self.assertEqual(chore.overdue_duration, self.chore.overdue_duration)
+                self.assertEqual([tag.name for tag in chore.tags.all()], [self.tag.name])
+                self.assertEqual(chore.tags.get().user, user)
+                self.assertEqual(chore.log_set.count(), 2)
+                self.assertEqual(chore.last_logged_at, self.now)
+                self.chore.refresh_from_db()
+                self.assertEqual(chore.next_due, self.chore.next_due)
+                self.assertIsNone(models.Chore.objects.get(
+                    user=user, name=self.untagged_chore.name).last_logged_at)
+                self.assertEqual(models.AwayDate.objects.get(user=user).end_date, self.away_date.end_date)
+
+    def test_rejects_unknown_reference(self):
+        data = json.dumps(dict(type="log", chore=1, timestamp=self.now.isoformat()))
+        user = create_random_user()
+        with self.assertRaisesMessage(CommandError, "line 1: Unknown chore id"):
+            self.import_(data, "jsonl", user)
+
+        self.assertFalse(models.Log.objects.filter(user=user).exists())
+
+    def test_rolls_back_failed_import(self):
+        data = self.export("jsonl") + json.dumps(dict(type="log", chore=0, timestamp=self.now.isoformat()))
+        user = create_random_user()
+        with self.assertRaisesMessage(CommandError, "line 8: Unknown chore id"):
+            self.import_(data, "jsonl", user)
+
+        self.assertFalse(models.Chore.objects.filter(user=user).exists())
+
+    def test_keeps_batches_committed_before_failure(self):
+        data = self.export("jsonl") + json.dumps(dict(type="log", chore=0, timestamp=self.now.isoformat()))
+        user = create_random_user()
+        with self.assertRaisesMessage(CommandError, "Unknown chore id"):
+            self.import_(data, "jsonl", user, commit_per_batch=True)
+
+        chore = models.Chore.objects.get(user=user, name=self.chore.name)
+        self.assertEqual(chore.log_set.count(), 2)
+        self.assertEqual(chore.last_logged_at, self.now)
+
+    def test_rejects_duplicate_rows(self):
+        data = self.export("csv")
+        data += data.splitlines()[5] + "\n"
+        with self.assertRaisesMessage(CommandError, "lines 6-9: UNIQUE constraint failed"):
+            self.import_(data, "csv", create_random_user(), batch_size=1000)
+
+    def test_rejects_malformed_line(self):
+        with self.assertRaisesMessage(CommandError, "Invalid import data on line 2"):
+            self.import_(json.dumps(dict(type="tag", id=1, name="Tag")) + "\n{", "jsonl", create_random_user())
+
+    def test_rejects_invalid_chore(self):
+        data = json.dumps(dict(type="chore", id=1, name="Chore", due_duration="PT1H"))
+        with self.assertRaisesMessage(CommandError, "specified in days"):
+            self.import_(data, "jsonl", create_random_user())
+
+    def test_unknown_user(self):
+        with self.assertRaisesMessage(CommandError, "Unknown user"):
+            call_command("export_chores", user="missing", stdout=StringIO())
+
+
+class TestBenchmark(TransactionTestCase):
+
+    def test_writes_json_report(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "benchmark.json")
+            out = StringIO()
+            call_command("benchmark", requests=2, chores=3, logs_per_chore=2,
+                         away_dates=1, tags=1, output=path, stdout=out)
+            with open(path, encoding="utf-8") as input:
+                report = json.load(input)
+
+        self.assertEqual(report["dataset"]["chores"], 3)
+        self.assertEqual(set(report["results"]), {
+            "index", "index_tag", "log_chore", "log_chore_htmx", "log_chore_htmx_full", "list_tags",
+            "list_away_dates"})
+        for result in report["results"].values():
+            self.assertEqual(result["requests"], 2)
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+            self.assertGreater(result["queries"], 0)
+            self.assertGreater(result["peak_memory_kib"], 0)
+
+        self.assertIn("log_chore_htmx", out.getvalue())
+        self.assertFalse(models.Chore.objects.exists())
+
+    def test_htmx_scenario_posts_chore_list_token(self):
+        user = get_user()
+        # a first completed chore changes the group markup, so one is completed beforehand
+        create_log(timezone.now(), create_chore(user), user)
+        for _ in range(2):
+            create_chore(user)
+        client = Client()
+        client.force_login(user)
+        send = benchmark.Command().scenarios(client, user)["log_chore_htmx"]
+
+        # the token keeps every request on the fast path that only moves the logged chore
+        for index in range(2):
+            response = send(index)
+            self.assertEqual(response.headers["HX-Reswap"], "delete")
+            self.assertIsNotNone(benchmark.find_chore_list_token(response))
+
+
+class TestMemprofile(TransactionTestCase):
+
+    def test_writes_json_report(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "memory.json")
+            out = StringIO()
+            call_command("memprofile", chores=20, logs_per_chore=1, top=3, output=path, stdout=out)
+            with open(path, encoding="utf-8") as input:
+                report = json.load(input)
+
+        self.assertEqual(report["chores"], 20)
+        self.assertLessEqual(report["pending_chores"], 20)
+        self.assertEqual(list(report["stages"]), ["get_grouped_sorted_chores", "query_pending_chores", "render"])
+        self.assertEqual(report["stages"]["get_grouped_sorted_chores"]["chores"], 20)
+        self.assertEqual(report["stages"]["render"]["chores"], report["pending_chores"])
+        for result in report["stages"].values():
+            self.assertGreater(result["peak_bytes"], 0)
+            self.assertGreaterEqual(result["peak_bytes"], result["retained_bytes"])
+            self.assertLessEqual(len(result["top_lines"]), 3)
+
+        self.assertIn("bytes per chore", out.getvalue())
+        self.assertFalse(models.Chore.objects.exists())
+
+    def test_unknown_user(self):
+        with self.assertRaises(CommandError):
+            call_command("memprofile", user="missing", stdout=StringIO())
+
+
+class TestSlowQueries(TestCase):
+
+    def write_log(self, path, entries):
+        with open(path, "w", encoding="utf-8") as output:
+            for sql, duration_ms, caller in entries:
+                output.write(json.dumps(dict(sql=sql, duration_ms=duration_ms, caller=caller)) + "\n")
+
+    def test_aggregates_by_fingerprint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "slow_queries.jsonl")
+            self.write_log(path, [
+                ("SELECT * FROM chores_awaydate WHERE user_id = %s", 30, "chores.away_calendar:10 in for_user"),
+                ("SELECT * FROM chores_chore WHERE id IN (%s, %s)", 5, "chores.queries:1 in list_chores"),
+            ])
+            self.write_log(os.path.join(directory, "slow_queries.123.jsonl.1"), [
+                ("SELECT * FROM chores_awaydate WHERE user_id = %s", 20, "chores.away_calendar:10 in for_user"),
+            ])
+            self.write_log(os.path.join(directory, "slow_queries.123.jsonl"), [])
+            out = StringIO()
+            call_command("slow_queries", path, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertRegex(lines[1], r"^\s+2\s+50\.0\s+25\.0\s+30\.0  SELECT \* FROM chores_awaydate WHERE user_id = \?$")
+        self.assertIn("2 from chores.away_calendar:10 in for_user", lines[2])
+        self.assertIn("chores_chore WHERE id IN (...)", lines[3])
+
+    def test_empty_log(self):
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            call_command("slow_queries", os.path.join(directory, "missing.jsonl"), stdout=out)
+
+        self.assertIn("No slow queries logged", out.getvalue())
@@ -25,3 +25,37 @@ class TestChoreForm(TestCase):
 
         form = forms.ChoreForm(user2)
         self.assertQuerySetEqual(form.fields["tags"].queryset, [])
+
+
+class TestTagFilterForm(TestCase):
+
+    def test_evaluates_tags_once(self):
+        user = create_random_user()
+        tag1 = create_tag(user)
+        tag2 = create_tag(user)
+        create_tag(create_random_user())
+
+        with self.assertNumQueries(1):
+            form = forms.TagFilterForm(user, dict(tag=tag2.id))
+            self.assertTrue(form.is_valid())
+            self.assertEqual(form.cleaned_data["tag"], tag2)
+            self.assertTrue(form.has_tags())
+            rendered = str(form["tag"])
+
+        self.assertIn(tag1.name, rendered)
+        self.assertIn(tag2.name, rendered)
+
+    def test_invalid_tag(self):
+        user = create_random_user()
+        other_tag = create_tag(create_random_user())
+
+        form = forms.TagFilterForm(user, dict(tag=other_tag.id))
+        self.assertFalse(form.is_valid())
+        self.assertFalse(form.has_tags())
+
+    def test_empty_tag(self):
+        user = create_random_user()
+
+        form = forms.TagFilterForm(user, dict(tag=""))
+        self.assertTrue(form.is_valid())
+        self.assertIsNone(form.cleaned_data["tag"])
@@ -0,0 +1,156 @@
+import sqlite3
+import tempfile
+from datetime import timedelta as td
+from pathlib import Path
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from chores import metrics
+
+from .utils import create_chore, create_log, get_user
+
+
+class MetricsTestCase(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(CHOREMINDER_METRICS=True,
+                                              CHOREMINDER_METRICS_DB=Path(directory.name) / "metrics.sqlite3")
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        store_patch = mock.patch.object(metrics, "store", metrics.MetricsStore())
+        store_patch.start()
+        self.addCleanup(store_patch.stop)
+
+
+class TestHistogram(TestCase):
+
+    def test_samples_are_cumulative(self):
+        histogram = metrics.Histogram("test_seconds", "Test.", (0.1, 1))
+        self.assertEqual(histogram.samples(0.5, view='a"b'), [
+            ("test_seconds_bucket", 'view="a\\"b",le="0.1"', 0),
+            ("test_seconds_bucket", 'view="a\\"b",le="1.0"', 1),
+            ("test_seconds_bucket", 'view="a\\"b",le="+Inf"', 1),
+            ("test_seconds_sum", 'view="a\\"b"', 0.5),
+            ("test_seconds_count", 'view="a\\"b"', 1),
+        ])
+
+
+class TestMetricsStore(MetricsTestCase):
+
+    def test_aggregates_across_processes(self):
+        # two stores stand in for two uwsgi processes sharing the metrics file
+        other_process = metrics.MetricsStore()
+        metrics.count_logs_written(2)
+        other_process.add(metrics.LOGS_WRITTEN.samples(3))
+        other_process.flush()
+
+        self.assertEqual(metrics.store.read(), [("chores_logs_written_total", "", 5.0)])
+        self.assertEqual(other_process.read(), [("chores_logs_written_total", "", 5.0)])
+
+    @override_settings(CHOREMINDER_METRICS_FLUSH_INTERVAL=60)
+    def test_buffers_between_flushes(self):
+        metrics.count_logs_written(1)
+        self.assertEqual(metrics.MetricsStore().read(), [])
+        metrics.store.flush()
+        self.assertEqual(metrics.MetricsStore().read(), [("chores_logs_written_total", "", 1.0)])
+
+    @override_settings(CHOREMINDER_METRICS_FLUSH_INTERVAL=0)
+    def test_failed_flush_kept_for_later(self):
+        with mock.patch("sqlite3.connect", side_effect=sqlite3.OperationalError("database is locked")), \
+                self.assertLogs("chores.metrics", "WARNING"):
+            metrics.count_logs_written(2)
+
+        metrics.count_logs_written(1)
+        self.assertEqual(metrics.MetricsStore().read(), [("chores_logs_written_total", "", 3.0)])
+
+    @override_settings(CHOREMINDER_METRICS_FLUSH_INTERVAL=0)
+    def test_schema_created_once(self):
+        with mock.patch.object(metrics.store, "create_schema", wraps=metrics.store.create_schema) as create_schema:
+            metrics.count_logs_written(1)
+            metrics.count_logs_written(1)
+
+        create_schema.assert_called_once()
+
+
+class TestRender(MetricsTestCase):
+
+    def test_renders_exposition_format(self):
+        user = get_user()
+        create_chore(user)
+        create_log(timezone.now(), create_chore(user), user)
+        metrics.observe_request("chores:index", 0.02, 3, 0.0002)
+        metrics.observe_request("chores:index", 0.2, 4, 0.0002)
+
+        lines = metrics.render().splitlines()
+        self.assertIn("# TYPE chores_request_duration_seconds histogram", lines)
+        start = lines.index('chores_request_duration_seconds_bucket{view="chores:index",le="0.005"} 0.0')
+        self.assertEqual(lines[start:start + 13], [
+            *(f'chores_request_duration_seconds_bucket{{view="chores:index",le="{le}"}} {count}'
+              for le, count in (("0.005", 0.0), ("0.01", 0.0), ("0.025", 1.0), ("0.05", 1.0), ("0.1", 1.0),
+                                ("0.25", 2.0), ("0.5", 2.0), ("1.0", 2.0), ("2.5", 2.0), ("5.0", 2.0),
+                                ("+Inf", 2.0))),
+            'chores_request_duration_seconds_sum{view="chores:index"} 0.22',
+            'chores_request_duration_seconds_count{view="chores:index"} 2.0',
+        ])
+        self.assertIn('chores_request_queries_sum{view="chores:index"} 7.0', lines)
+        self.assertIn("# TYPE chores_chores gauge", lines)
+        self.assertIn('chores_chores{state="completed"} 1', lines)
+        self.assertIn('chores_chores{state="due"} 1', lines)
+        self.assertIn('chores_chores{state="overdue"} 0', lines)
+
+    def test_state_counts_follow_time(self):
+        user = get_user()
+        create_log(timezone.now(), create_chore(user), user)
+        lines = metrics.render(timezone.now() + td(days=3)).splitlines()
+        self.assertIn('chores_chores{state="overdue"} 1', lines)
+
+
+class TestMetricsViews(MetricsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user()
+        self.client.force_login(self.user)
+
+    @override_settings(CHOREMINDER_METRICS=False)
+    def test_disabled(self):
+        response = self.client.get(reverse("chores:list_metrics"))
+        self.assertEqual(response.status_code, 404)
+
+    def test_superusers_only_without_token(self):
+        response = self.client.get(reverse("chores:list_metrics"))
+        self.assertEqual(response.status_code, 403)
+
+        self.user.is_superuser = True
+        self.user.save()
+        response = self.client.get(reverse("chores:list_metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/plain; version=0.0.4; charset=utf-8")
+
+    @override_settings(CHOREMINDER_METRICS_TOKEN="secret")
+    def test_bearer_token(self):
+        self.client.logout()
+        response = self.client.get(reverse("chores:list_metrics"), headers={"Authorization": "Bearer wrong"})
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get(reverse("chores:list_metrics"), headers={"Authorization": "Bearer secret"})
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(CHOREMINDER_METRICS_TOKEN="secret")
+    def test_records_requests_and_log_writes(self):
+        chore = create_chore(self.user)
+        self.client.get(reverse("chores:index"))
+        self.client.post(reverse("chores:log_chore", args=(chore.id,)))
+        self.client.get("/missing")
+
+        response = self.client.get(reverse("chores:list_metrics"), headers={"Authorization": "Bearer secret"})
+        lines = response.content.decode().splitlines()
+        self.assertIn('chores_request_duration_seconds_count{view="chores:index"} 1.0', lines)
+        self.assertIn('chores_request_duration_seconds_count{view="chores:log_chore"} 1.0', lines)
+        self.assertIn('chores_request_duration_seconds_count{view="unmatched"} 1.0', lines)
+        self.assertIn('chores_status_duration_seconds_count{view="chores:index"} 1.0', lines)
+        self.assertIn("chores_logs_written_total 1.0", lines)
@@ -0,0 +1,101 @@
+import json
+import pstats
+import re
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from chores import timing
+
+from .utils import TIMED_TEMPLATES, create_chore, create_log, get_user
+
+SERVER_TIMING = re.compile(
+    r'^db;dur=[\d.]+;desc="(\d+) queries", status;dur=[\d.]+, template;dur=[\d.]+, total;dur=[\d.]+$')
+
+
+class TestPerformanceMiddleware(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user()
+        create_log(timezone.now(), create_chore(self.user), self.user)
+        self.client.force_login(self.user)
+
+    def test_disabled_by_default(self):
+        response = self.client.get(reverse("chores:index"))
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(CHOREMINDER_PERFORMANCE_TIMING=True, TEMPLATES=TIMED_TEMPLATES)
+    def test_reports_timings(self):
+        with self.assertLogs("chores.performance", "INFO") as logs:
+            response = self.client.get(reverse("chores:index"))
+
+        match = SERVER_TIMING.match(response["Server-Timing"])
+        self.assertIsNotNone(match, response["Server-Timing"])
+        self.assertGreater(int(match.group(1)), 0)
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["path"], reverse("chores:index"))
+        self.assertEqual(line["status"], 200)
+        self.assertEqual(line["queries"], int(match.group(1)))
+        self.assertGreater(line["template_ms"], 0)
+        self.assertGreater(line["status_ms"], 0)
+        self.assertIsNone(timing.current_timings.get())
+
+
+class TestProfilingMiddleware(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.profile_dir = Path(self.directory.name) / "profiles"
+        cache.clear()
+        self.user = get_user()
+        create_chore(self.user)
+
+    def get_index(self, **params):
+        with override_settings(CHOREMINDER_PROFILE_DIR=self.profile_dir):
+            return self.client.get(reverse("chores:index"), params)
+
+    def test_profiles_for_superusers(self):
+        self.user.is_superuser = True
+        self.user.save()
+        self.client.force_login(self.user)
+        response = self.get_index(_profile=1)
+
+        self.assertEqual(response["Content-Type"], "text/plain; charset=utf-8")
+        content = response.content.decode()
+        self.assertIn("GET /?_profile=1 -> 200", content)
+        self.assertIn("cumulative", content)
+        self.assertIn("build_chore_list", content)
+
+        profile_path, = self.profile_dir.iterdir()
+        self.assertTrue(profile_path.name.endswith("-index.prof"))
+        self.assertIn(str(profile_path), content)
+        self.assertTrue(pstats.Stats(str(profile_path)).total_calls)
+
+    def test_ignored_for_other_users(self):
+        self.client.force_login(self.user)
+        response = self.get_index(_profile=1)
+        self.assertTemplateUsed(response, "chores/index.html")
+        self.assertFalse(self.profile_dir.exists())
+
+    def test_ignored_without_parameter(self):
+        self.client.force_login(User.objects.create_superuser("admin"))
+        response = self.get_index()
+        self.assertTemplateUsed(response, "chores/index.html")
+        self.assertFalse(self.profile_dir.exists())
+
+    @override_settings(CHOREMINDER_PROFILING=False)
+    def test_disabled(self):
+        self.user.is_superuser = True
+        self.user.save()
+        self.client.force_login(self.user)
+        response = self.get_index(_profile=1)
+        self.assertTemplateUsed(response, "chores/index.html")
+        self.assertFalse(self.profile_dir.exists())
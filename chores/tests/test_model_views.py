@@ -1,11 +1,14 @@
 import datetime
 from datetime import timedelta as td
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
+from chores import models
 from chores.model_views import (Chore, ChoreState, ChoreStatus, Log,
-                                add_delta_with_away_dates, compute_status)
+                                add_delta_with_away_dates, calculate_progress,
+                                compute_status, compute_statuses,
+                                earliest_status_change)
 
 from .utils import create_away_date, create_chore, create_log, get_user
 
@@ -137,6 +140,122 @@ class ComputeStatusTest(TestCase):
             last_log_timestamp -= td(hours=6)
 
 
+class CalculateProgressTest(TestCase):
+
+    def test_quantized_to_step(self):
+        start = timezone.now()
+        end = start + td(days=1)
+
+        with override_settings(CHOREMINDER_PROGRESS_STEP=1):
+            self.assertEqual(calculate_progress(
+                start, end, start + td(minutes=30)), (2, start + td(minutes=43, seconds=12)))
+
+        with override_settings(CHOREMINDER_PROGRESS_STEP=5):
+            self.assertEqual(calculate_progress(
+                start, end, start + td(minutes=30)), (0, start + td(hours=1, minutes=12)))
+            self.assertEqual(calculate_progress(
+                start, end, start + td(hours=23)), (95, end))
+
+    def test_changes_at_next_step(self):
+        start = timezone.now()
+        end = start + td(days=7, seconds=1)
+        current_time = start + td(hours=5)
+
+        for step in (0.01, 1, 3, 10):
+            with override_settings(CHOREMINDER_PROGRESS_STEP=step):
+                percentage, changes_at = calculate_progress(
+                    start, end, current_time)
+                self.assertGreater(changes_at, current_time)
+                self.assertEqual(calculate_progress(
+                    start, end, changes_at - td(microseconds=1))[0], percentage)
+                self.assertEqual(calculate_progress(
+                    start, end, changes_at)[0], round(percentage + step, 2))
+
+    def test_empty_range(self):
+        now = timezone.now()
+        self.assertEqual(calculate_progress(now, now, now), (0, now))
+
+
+class EarliestStatusChangeTest(TestCase):
+
+    def test_earliest(self):
+        now = timezone.now()
+        user = get_user()
+        statuses = [
+            compute_status(user, now, None, td(days=1), None),
+            compute_status(user, now, now - td(days=3), td(days=1), None),
+            compute_status(user, now, now - td(hours=6), td(days=1), None),
+            compute_status(user, now, now - td(days=1, hours=12),
+                           td(days=1), td(days=1)),
+        ]
+
+        self.assertIsNone(statuses[0].changes_at)
+        self.assertIsNone(statuses[1].changes_at)
+        self.assertEqual(earliest_status_change(statuses),
+                         now - td(hours=6) + td(hours=6, minutes=14, seconds=24))
+        self.assertIsNone(earliest_status_change(statuses[:2]))
+
+    def test_state_flip(self):
+        now = timezone.now()
+        with override_settings(CHOREMINDER_PROGRESS_STEP=50):
+            status = compute_status(
+                get_user(), now, now - td(hours=13), td(days=1), td(days=1))
+
+        self.assertEqual(status.changes_at, now + td(hours=11))
+
+
+class ComputeStatusesTest(TestCase):
+
+    def test_no_chores(self):
+        user = get_user()
+        with self.assertNumQueries(0):
+            self.assertEqual(compute_statuses(user, [], timezone.now()), {})
+
+    def test_matches_compute_status(self):
+        user = get_user()
+        now = timezone.now()
+        _ = create_away_date(user, now.date() - td(days=1),
+                             now.date() + td(days=1))
+
+        chore_no_log = create_chore(user)
+        chore_completed = create_chore(user)
+        create_log(now - td(hours=6), chore_completed, user)
+        chore_overdue = create_chore(user)
+        create_log(now - td(days=10), chore_overdue, user)
+        create_log(now - td(days=20), chore_overdue, user)
+
+        chores = list(models.Chore.objects.filter(
+            pk__in=(chore_no_log.id, chore_completed.id, chore_overdue.id)))
+        statuses = compute_statuses(user, chores, now)
+
+        self.assertEqual(statuses, {
+            chore_no_log.id: compute_status(
+                user, now, None, td(days=1), td(days=1)),
+            chore_completed.id: compute_status(
+                user, now, now - td(hours=6), td(days=1), td(days=1)),
+            chore_overdue.id: compute_status(
+                user, now, now - td(days=10), td(days=1), td(days=1)),
+        })
+
+    def test_query_count_independent_of_chore_count(self):
+        user = get_user()
+        now = timezone.now()
+        _ = create_away_date(user, now.date(), now.date() + td(days=1))
+
+        chores = []
+        for chore_count in (1, 10):
+            while len(chores) < chore_count:
+                chore = create_chore(user)
+                create_log(now - td(days=len(chores)), chore, user)
+                chore.refresh_from_db()
+                chores.append(chore)
+
+            with self.assertNumQueries(1):
+                statuses = compute_statuses(user, chores, now)
+
+            self.assertEqual(len(statuses), chore_count)
+
+
 class ChoreModelViewTest(TestCase):
 
     def test_latest_chore(self):
@@ -150,7 +269,11 @@ class ChoreModelViewTest(TestCase):
         create_log(now-datetime.timedelta(days=1), chore, user)
         log2 = create_log(now+datetime.timedelta(days=1), chore, user)
 
-        self.assertEqual(chore_view.latest_log, Log(log2))
+        # the latest log is only fetched once per view
+        with self.assertNumQueries(0):
+            self.assertIsNone(chore_view.latest_log)
+
+        self.assertEqual(Chore(chore).latest_log, Log(log2))
 
     def test_weight(self):
         user = get_user()
@@ -0,0 +1,93 @@
+import random
+import unittest
+from datetime import timedelta as td
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from chores import models, numpy_backend
+from chores.away_calendar import AwayCalendar
+from chores.model_views import compute_statuses, project_due_dates
+
+from .utils import create_away_date, create_chore, create_log, get_user
+
+
+def build_random_calendar(rng: random.Random, base_time) -> AwayCalendar:
+    away_dates = []
+    for _ in range(rng.randint(0, 15)):
+        start_date = (base_time + td(days=rng.randint(-30, 400))).date()
+        end_date = start_date + td(days=rng.randint(0, 20))
+        away_dates.append(models.AwayDate(
+            name="away", start_date=start_date, end_date=end_date))
+
+    return AwayCalendar(away_dates)
+
+
+@unittest.skipUnless(numpy_backend.is_available(), "NumPy is not installed")
+class TestProjectDueDates(TestCase):
+
+    def test_matches_python_backend(self):
+        rng = random.Random(2442)
+        base_time = timezone.now()
+
+        for _ in range(50):
+            calendar = build_random_calendar(rng, base_time)
+            count = rng.randint(0, 40)
+            latest_log_timestamps = [base_time + td(days=rng.randint(-10, 60), hours=rng.randint(0, 23))
+                                     for _ in range(count)]
+            due_durations = [td(days=rng.choice((0, 1, 2, 7, 30, 365)))
+                             for _ in range(count)]
+            overdue_durations = [rng.choice((None, td(), td(days=1), td(days=14)))
+                                 for _ in range(count)]
+
+            self.assertEqual(
+                numpy_backend.project_due_dates(
+                    calendar, latest_log_timestamps, due_durations, overdue_durations),
+                project_due_dates(calendar, latest_log_timestamps, due_durations, overdue_durations))
+
+    def test_no_away_dates_keeps_delta(self):
+        now = timezone.now()
+        next_dues, next_overdues = numpy_backend.project_due_dates(
+            AwayCalendar([]), [now], [td(days=1, hours=2)], [None])
+
+        self.assertEqual(next_dues, [now + td(days=1, hours=2)])
+        self.assertEqual(next_overdues, [None])
+
+
+class TestComputeStatusesBackends(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = get_user()
+        self.now = timezone.now()
+        create_away_date(self.user, self.now.date() - td(days=2),
+                         self.now.date() + td(days=1))
+
+        self.chores = [create_chore(self.user) for _ in range(5)]
+        for index, chore in enumerate(self.chores[1:]):
+            create_log(self.now - td(days=index, hours=3), chore, self.user)
+        for chore in self.chores:
+            chore.refresh_from_db()
+
+    @unittest.skipUnless(numpy_backend.is_available(), "NumPy is not installed")
+    def test_numpy_backend_matches(self):
+        with override_settings(CHOREMINDER_NUMPY_STATUS_THRESHOLD=10000):
+            expected = compute_statuses(self.user, self.chores, self.now)
+
+        with override_settings(CHOREMINDER_NUMPY_STATUS_THRESHOLD=0), \
+                mock.patch.object(numpy_backend, "project_due_dates",
+                                  wraps=numpy_backend.project_due_dates) as numpy_project:
+            self.assertEqual(compute_statuses(
+                self.user, self.chores, self.now), expected)
+
+        numpy_project.assert_called_once()
+
+    def test_falls_back_without_numpy(self):
+        with override_settings(CHOREMINDER_NUMPY_STATUS_THRESHOLD=0), \
+                mock.patch.object(numpy_backend, "numpy", None), \
+                mock.patch.object(numpy_backend, "project_due_dates") as numpy_project:
+            statuses = compute_statuses(self.user, self.chores, self.now)
+
+        numpy_project.assert_not_called()
+        self.assertEqual(len(statuses), len(self.chores))
@@ -1,9 +1,12 @@
+from datetime import timedelta as td
+
 from django.test import TestCase
+from django.utils import timezone
 
-from chores import model_views, queries
+from chores import model_views, models, queries
 
-from .utils import (create_away_date, create_chore, create_random_user,
-                    create_tag)
+from .utils import (create_away_date, create_chore, create_log,
+                    create_random_user, create_tag)
 
 
 class TestQueryChores(TestCase):
@@ -40,6 +43,103 @@ class TestQueryChores(TestCase):
         self.assertEqual(queries.query_chores(user, tag2.id),
                          [model_views.Chore(chore3)])
 
+    def test_loads_tags_in_fixed_queries(self):
+        user = create_random_user()
+        tag = create_tag(user)
+        for _ in range(10):
+            create_log(timezone.now(), create_chore(user, tag=tag), user)
+
+        with self.assertNumQueries(2):
+            chores = queries.query_chores(user, tag.id)
+            for chore in chores:
+                self.assertEqual(chore.tags, [model_views.Tag(tag)])
+                self.assertEqual(chore.status.state,
+                                 model_views.ChoreState.COMPLETED)
+
+    def test_statuses_computed_with_chores(self):
+        user = create_random_user()
+        create_chore(user)
+        create_chore(user)
+
+        chores = queries.query_chores(user, None)
+        with self.assertNumQueries(0):
+            for chore in chores:
+                self.assertEqual(chore.status.state,
+                                 model_views.ChoreState.DUE)
+
+
+class TestAnnotateStatus(TestCase):
+
+    def test_matches_python_status(self):
+        user = create_random_user()
+        now = timezone.now()
+
+        chores = [create_chore(user) for _ in range(8)]
+        for chore, hours_ago in zip(chores, (1, 6, 20, 30, 40, 47, 60)):
+            create_log(now - td(hours=hours_ago), chore, user)
+
+        annotated = queries.annotate_status(
+            models.Chore.objects.filter(user=user), now).order_by("-weight", "id")
+        expected = sorted(
+            (model_views.Chore(chore, model_views.scheduled_status(chore, now))
+             for chore in models.Chore.objects.filter(user=user).order_by("id")),
+            key=lambda chore: chore.weight, reverse=True)
+
+        self.assertEqual(list(annotated), [chore._obj for chore in expected])
+        for chore, chore_view in zip(annotated, expected):
+            self.assertEqual(chore.state, chore_view.status.state.value)
+            self.assertAlmostEqual(chore.weight, chore_view.weight)
+
+
+class TestQueryPendingChores(TestCase):
+
+    def test_sorted_by_weight(self):
+        now = timezone.now()
+        user = create_random_user()
+
+        chore_completed = create_chore(user)
+        create_log(now - td(hours=1), chore_completed, user)
+
+        chore_due = create_chore(user)
+        create_log(now - td(days=1, hours=1), chore_due, user)
+
+        chore_overdue = create_chore(user)
+        create_log(now - td(days=2, hours=1), chore_overdue, user)
+
+        chore_no_log = create_chore(user)
+
+        self.assertEqual(queries.query_pending_chores(user, None, now), [
+            model_views.Chore(chore_overdue), model_views.Chore(chore_due), model_views.Chore(chore_no_log)])
+
+
+class TestQueryCompletedChores(TestCase):
+
+    def test_keyset_pagination(self):
+        user = create_random_user()
+        now = timezone.now()
+
+        chores = [create_chore(user) for _ in range(5)]
+        for chore, hours_ago in zip(chores, (20, 6, 0, 0)):
+            create_log(now - td(hours=hours_ago), chore, user)
+
+        first_page = queries.query_completed_chores(user, None, now, None, 2)
+        self.assertEqual([chore.id for chore in first_page], [chores[0].id, chores[1].id])
+
+        last = first_page[-1]
+        second_page = queries.query_completed_chores(user, None, now, (last.weight, last.id), 2)
+        self.assertEqual([chore.id for chore in second_page], [chores[2].id, chores[3].id])
+
+    def test_group_summary(self):
+        user = create_random_user()
+        now = timezone.now()
+
+        chores = [create_chore(user) for _ in range(3)]
+        create_log(now - td(hours=6), chores[0], user)
+        create_log(now - td(hours=1), chores[1], user)
+
+        self.assertEqual(queries.query_group_summary(user, None, now), dict(
+            Pending=1, Completed=2, completed_changes_at=now + td(hours=18)))
+
 
 class TestQueryTags(TestCase):
 
@@ -0,0 +1,77 @@
+import datetime
+import json
+import logging
+import os
+import tempfile
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from chores import queries, query_log
+
+from .utils import create_tag, get_user
+
+
+class TestFingerprint(TestCase):
+
+    def test_normalizes_literals(self):
+        self.assertEqual(
+            query_log.fingerprint("SELECT *  FROM t1\n WHERE name = 'it''s' AND id IN (%s, %s,%s) AND x > 2.5"),
+            "SELECT * FROM t1 WHERE name = ? AND id IN (...) AND x > ?")
+        self.assertEqual(query_log.fingerprint("SELECT 1 WHERE id IN (%s)"),
+                         query_log.fingerprint("SELECT 2 WHERE id IN (%s, %s)"))
+
+
+class TestParamsShape(TestCase):
+
+    def test_shapes(self):
+        self.assertIsNone(query_log.params_shape(None, False))
+        self.assertEqual(query_log.params_shape((1, "a", None), False), ["int", "str", "NoneType"])
+        self.assertEqual(query_log.params_shape(dict(name="a"), False), dict(name="str"))
+        self.assertEqual(query_log.params_shape(iter([(1, datetime.date.today())] * 3), True),
+                         dict(rows=3, row=["int", "date"]))
+
+
+class TestLogSlowQueries(TestCase):
+
+    def test_logs_queries_over_threshold(self):
+        user = get_user()
+        create_tag(user)
+        # only queries inside assertLogs are logged, the others would reach the real log file
+        with self.assertLogs("chores.slow_queries", "WARNING") as logs, \
+                override_settings(CHOREMINDER_SLOW_QUERY_THRESHOLD=0):
+            queries.query_tags(user)
+
+        entry = json.loads(logs.records[-1].getMessage())
+        self.assertIn("chores_tag", entry["sql"])
+        self.assertEqual(entry["params"], ["int"])
+        self.assertFalse(entry["many"])
+        self.assertGreaterEqual(entry["duration_ms"], 0)
+        self.assertRegex(entry["caller"], r"^chores\.queries:\d+ in query_tags$")
+
+    def test_disabled_by_default(self):
+        with self.assertNoLogs("chores.slow_queries"):
+            queries.query_tags(get_user())
+
+    def test_installed_once(self):
+        query_log.install_query_logger(None, connection)
+        self.assertEqual(connection.execute_wrappers.count(query_log.log_slow_queries), 1)
+
+
+class TestProcessRotatingFileHandler(TestCase):
+
+    def test_file_per_process(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(CHOREMINDER_SLOW_QUERY_LOG=os.path.join(directory, "slow.jsonl")):
+            handler = query_log.ProcessRotatingFileHandler(maxBytes=1024, backupCount=1)
+            try:
+                for pid in (100, 101):
+                    with mock.patch("os.getpid", return_value=pid):
+                        handler.emit(logging.makeLogRecord(dict(msg=f"from {pid}")))
+            finally:
+                handler.close()
+
+            self.assertEqual(sorted(os.listdir(directory)), ["slow.100.jsonl", "slow.101.jsonl"])
+            with open(os.path.join(directory, "slow.101.jsonl"), encoding="utf-8") as input:
+                self.assertEqual(input.read(), "from 101\n")
@@ -0,0 +1,104 @@
+import re
+from datetime import timedelta as td
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from chores import model_views, models, queries
+from chores.away_calendar import AwayCalendar
+
+from .utils import (create_away_date, create_chore, create_log,
+                    create_random_user, create_tag)
+
+# a full scan reads every row whether it walks the table or one of its indexes
+SCAN = re.compile(r"^SCAN (TABLE )?\w+\b")
+
+
+class TestQueryPlans(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.users = [create_random_user() for _ in range(3)]
+        for user in cls.users:
+            tag = create_tag(user)
+            for index in range(10):
+                chore = create_chore(user, tag if index % 2 else None)
+                for days_ago in range(index % 4):
+                    create_log(now - td(days=days_ago, hours=index), chore, user)
+
+            for days_ago in (30, 10, 1):
+                start_date = (now - td(days=days_ago)).date()
+                create_away_date(user, start_date, start_date + td(days=2))
+
+        cls.user = cls.users[0]
+        cls.tag = models.Tag.objects.filter(user=cls.user).first()
+
+    def assertNoTableScans(self, func):
+        with CaptureQueriesContext(connection) as captured:
+            func()
+
+        selects = [query["sql"] for query in captured.captured_queries
+                   if query["sql"].startswith("SELECT")]
+        self.assertTrue(selects)
+        with connection.cursor() as cursor:
+            for sql in selects:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                details = [row[-1] for row in cursor.fetchall()]
+                scans = [detail for detail in details if SCAN.match(detail)]
+                self.assertEqual(scans, [], f"{sql}\n{details}")
+
+    def test_scan_pattern(self):
+        for detail in ("SCAN chores_log", "SCAN TABLE chores_log",
+                       "SCAN chores_log USING INDEX chores_log_chore_id",
+                       "SCAN chores_chore USING COVERING INDEX chores_chore_user_id"):
+            self.assertRegex(detail, SCAN)
+        self.assertNotRegex("SEARCH chores_log USING INDEX chores_log_chore_id (chore_id=?)", SCAN)
+
+    def test_query_chores(self):
+        self.assertNoTableScans(lambda: queries.query_chores(self.user, None))
+        self.assertNoTableScans(lambda: queries.query_chores(self.user, self.tag.id))
+
+    def test_query_pending_chores(self):
+        now = timezone.now()
+        self.assertNoTableScans(lambda: queries.query_pending_chores(self.user, None, now))
+        self.assertNoTableScans(lambda: queries.query_pending_chores(self.user, self.tag.id, now))
+
+    def test_query_completed_chores(self):
+        now = timezone.now()
+        self.assertNoTableScans(lambda: queries.query_completed_chores(
+            self.user, None, now, (50.0, 1), 10))
+        self.assertNoTableScans(lambda: queries.query_completed_chores(
+            self.user, self.tag.id, now, None, 10))
+
+    def test_query_group_summary(self):
+        now = timezone.now()
+        self.assertNoTableScans(lambda: queries.query_group_summary(self.user, None, now))
+        self.assertNoTableScans(lambda: queries.query_group_summary(self.user, self.tag.id, now))
+
+    def test_query_tags(self):
+        self.assertNoTableScans(lambda: queries.query_tags(self.user))
+
+    def test_query_away_dates(self):
+        self.assertNoTableScans(lambda: queries.query_away_dates(self.user))
+
+    def test_away_calendar(self):
+        self.assertNoTableScans(lambda: AwayCalendar.for_user(self.user))
+        self.assertNoTableScans(lambda: AwayCalendar.for_user(
+            self.user, since=timezone.now().date()))
+
+    def test_compute_statuses(self):
+        chores = list(models.Chore.objects.filter(user=self.user))
+        self.assertNoTableScans(lambda: model_views.compute_statuses(
+            self.user, chores, timezone.now()))
+
+    def test_latest_log(self):
+        chore = models.Chore.objects.filter(user=self.user).last()
+        self.assertNoTableScans(lambda: model_views.Chore(chore).latest_log)
+
+    def test_query_chore_logs(self):
+        chore = models.Chore.objects.filter(user=self.user).last()
+        self.assertNoTableScans(lambda: queries.query_chore_logs(chore, None, 10))
+        self.assertNoTableScans(lambda: queries.query_chore_logs(chore, (timezone.now(), 1), 10))
@@ -0,0 +1,82 @@
+from datetime import timedelta as td
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from chores import models, seeding
+
+
+class TestSeedDataset(TestCase):
+
+    def test_seeds_requested_sizes(self):
+        users = seeding.seed_dataset(users=2, chores=4, logs_per_chore=3, away_dates=2, tags=2)
+        self.assertEqual(len(users), 2)
+        for user in users:
+            self.assertEqual(models.Chore.objects.filter(user=user).count(), 4)
+            self.assertEqual(models.Log.objects.filter(chore__user=user).count(), 12)
+            self.assertEqual(models.AwayDate.objects.filter(user=user).count(), 2)
+            self.assertEqual(models.Tag.objects.filter(user=user).count(), 2)
+
+        for chore in models.Chore.objects.all():
+            self.assertEqual(chore.last_logged_at, chore.log_set.order_by("-timestamp").first().timestamp)
+            self.assertIsNotNone(chore.next_due)
+
+    def test_is_deterministic(self):
+        now = timezone.now()
+
+        def snapshot(prefix):
+            user, = seeding.seed_dataset(chores=5, logs_per_chore=2, seed=3, username_prefix=prefix, now=now)
+            return list(models.Log.objects.filter(chore__user=user).order_by("id").values_list(
+                "chore__name", "chore__due_duration", "timestamp"))
+
+        self.assertEqual(snapshot("first"), snapshot("second"))
+
+    def test_batches(self):
+        self.assertEqual(list(seeding.batches(iter(range(5)), 2)), [[0, 1], [2, 3], [4]])
+
+    def test_years_bound_the_history(self):
+        now = timezone.now()
+        user, = seeding.seed_dataset(chores=5, logs_per_chore=None, years=2, away_dates=10, now=now)
+        logs = models.Log.objects.filter(chore__user=user)
+        self.assertGreaterEqual(min(logs.values_list("timestamp", flat=True)), now - td(days=730))
+        for chore in models.Chore.objects.filter(user=user):
+            # every chore is logged back to roughly the start of the history
+            self.assertLess(chore.log_set.order_by("timestamp").first().timestamp,
+                            now - td(days=730) + chore.due_duration * 1.5)
+
+        away_dates = models.AwayDate.objects.filter(user=user)
+        self.assertTrue(all(away_date.start_date <= away_date.end_date for away_date in away_dates))
+
+    def test_requires_a_history_bound(self):
+        with self.assertRaises(ValueError):
+            seeding.seed_dataset(logs_per_chore=None, years=None)
+
+    def test_commits_logs_in_transactions(self):
+        user, = seeding.seed_dataset(chores=1, logs_per_chore=0)
+        chore = models.Chore.objects.get(user=user)
+        now = timezone.now()
+        logs = ((now - td(days=days), chore.id, user.id) for days in range(5))
+        with mock.patch("chores.seeding.transaction.atomic", wraps=transaction.atomic) as atomic:
+            self.assertEqual(seeding.insert_logs(logs, batch_size=1, transaction_size=2), 5)
+
+        self.assertEqual(atomic.call_count, 3)
+        self.assertEqual(sorted(chore.log_set.values_list("timestamp", flat=True)),
+                         [now - td(days=days) for days in range(4, -1, -1)])
+
+
+class TestSeedScaleData(TestCase):
+
+    def test_seeds(self):
+        out = StringIO()
+        call_command("seed_scale_data", users=2, chores=3, years=0.1, away_dates=2, tags=2,
+                     username_prefix="scale", stdout=out)
+        self.assertIn("Seeded scale-1", out.getvalue())
+        self.assertEqual(models.Chore.objects.filter(user__username__startswith="scale-").count(), 6)
+        self.assertTrue(models.Log.objects.exists())
+
+        with self.assertRaisesMessage(CommandError, "already exist"):
+            call_command("seed_scale_data", users=1, username_prefix="scale", stdout=StringIO())
@@ -0,0 +1,191 @@
+from datetime import timedelta as td
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from chores import actions, models
+
+from .utils import (create_away_date, create_chore, create_log,
+                    create_random_user, get_user)
+
+
+class TestLastLoggedAt(TestCase):
+
+    def assertLastLoggedAt(self, chore: models.Chore, expected):
+        chore.refresh_from_db()
+        self.assertEqual(chore.last_logged_at, expected)
+
+    def test_log_created(self):
+        user = get_user()
+        chore = create_chore(user)
+        self.assertLastLoggedAt(chore, None)
+
+        now = timezone.now()
+        create_log(now, chore, user)
+        self.assertLastLoggedAt(chore, now)
+
+        # older logs do not move the timestamp back
+        create_log(now - td(days=1), chore, user)
+        self.assertLastLoggedAt(chore, now)
+
+    def test_log_edited(self):
+        user = get_user()
+        chore = create_chore(user)
+        now = timezone.now()
+        create_log(now - td(days=2), chore, user)
+        log = create_log(now, chore, user)
+
+        log.timestamp = now - td(days=3)
+        log.save()
+        self.assertLastLoggedAt(chore, now - td(days=2))
+
+    def test_log_moved_to_other_chore(self):
+        user = get_user()
+        chore1 = create_chore(user)
+        chore2 = create_chore(user)
+        now = timezone.now()
+        log = create_log(now, chore1, user)
+
+        log.chore = chore2
+        log.save()
+        self.assertLastLoggedAt(chore1, None)
+        self.assertLastLoggedAt(chore2, now)
+
+    def test_log_deleted(self):
+        user = get_user()
+        chore = create_chore(user)
+        now = timezone.now()
+        log1 = create_log(now - td(days=1), chore, user)
+        log2 = create_log(now, chore, user)
+
+        log2.delete()
+        self.assertLastLoggedAt(chore, now - td(days=1))
+
+        models.Log.objects.filter(pk=log1.pk).delete()
+        self.assertLastLoggedAt(chore, None)
+
+    def test_logs_deleted_together(self):
+        user = get_user()
+        chore1 = create_chore(user)
+        chore2 = create_chore(user)
+        now = timezone.now()
+        for days in range(3):
+            create_log(now - td(days=days + 1), chore1, user)
+            create_log(now - td(days=days + 1), chore2, user)
+        create_log(now - td(days=5), chore2, user)
+
+        with mock.patch("chores.actions.refresh_logged_chores",
+                        wraps=actions.refresh_logged_chores) as refresh_logged_chores:
+            models.Log.objects.filter(timestamp__gt=now - td(days=4)).delete()
+
+        self.assertEqual(refresh_logged_chores.call_count, 2)
+        self.assertLastLoggedAt(chore1, None)
+        self.assertLastLoggedAt(chore2, now - td(days=5))
+
+    def test_chore_deleted(self):
+        user = get_user()
+        chore = create_chore(user)
+        for days in range(5):
+            create_log(timezone.now() - td(days=days), chore, user)
+
+        # the cascaded logs refresh nothing
+        with mock.patch("chores.actions.refresh_logged_chores") as refresh_logged_chores:
+            chore.delete()
+        refresh_logged_chores.assert_not_called()
+        self.assertFalse(models.Log.objects.exists())
+
+    def test_user_deleted(self):
+        user = get_user()
+        other_user = create_random_user()
+        chore = create_chore(user)
+        other_chore = create_chore(other_user)
+        create_log(timezone.now(), chore, user)
+        create_log(timezone.now(), other_chore, user)
+
+        with mock.patch("chores.actions.refresh_logged_chores") as refresh_logged_chores:
+            user.delete()
+        refresh_logged_chores.assert_not_called()
+        self.assertFalse(models.Chore.objects.filter(pk=chore.pk).exists())
+        # logs on other users' chores are kept without their author
+        self.assertIsNone(models.Log.objects.get(chore=other_chore).user)
+
+
+class TestSchedule(TestCase):
+
+    def assertSchedule(self, chore: models.Chore, next_due, next_overdue):
+        chore.refresh_from_db()
+        self.assertEqual(chore.next_due, next_due)
+        self.assertEqual(chore.next_overdue, next_overdue)
+
+    def test_log_created_and_deleted(self):
+        user = get_user()
+        chore = create_chore(user)
+        self.assertSchedule(chore, None, None)
+
+        now = timezone.now()
+        log = create_log(now, chore, user)
+        self.assertSchedule(chore, now + td(days=1), now + td(days=2))
+
+        log.delete()
+        self.assertSchedule(chore, None, None)
+
+    def test_durations_edited(self):
+        user = get_user()
+        chore = create_chore(user)
+        now = timezone.now()
+        create_log(now, chore, user)
+
+        chore = models.Chore.objects.get(pk=chore.pk)
+        chore.due_duration = td(days=3)
+        chore.overdue_duration = None
+        chore.save()
+        self.assertSchedule(chore, now + td(days=3), None)
+
+    def test_stale_instance_does_not_reset_log_timestamp(self):
+        user = get_user()
+        chore = create_chore(user)
+        now = timezone.now()
+        create_log(now, chore, user)
+
+        chore.name = "renamed"
+        chore.save()
+        self.assertSchedule(chore, now + td(days=1), now + td(days=2))
+
+    def test_away_date_created_edited_deleted(self):
+        user = get_user()
+        chore = create_chore(user)
+        now = timezone.now()
+        create_log(now, chore, user)
+
+        away_date = create_away_date(user, now.date() + td(days=1),
+                                     now.date() + td(days=2))
+        self.assertSchedule(chore, now + td(days=3), now + td(days=4))
+
+        away_date.end_date = now.date() + td(days=1)
+        away_date.save()
+        self.assertSchedule(chore, now + td(days=2), now + td(days=3))
+
+        away_date.delete()
+        self.assertSchedule(chore, now + td(days=1), now + td(days=2))
+
+    def test_away_date_only_refreshes_affected_chores(self):
+        user = get_user()
+        now = timezone.now()
+        chore_pending = create_chore(user)
+        create_log(now, chore_pending, user)
+        chore_finished_window = create_chore(user)
+        create_log(now - td(days=30), chore_finished_window, user)
+        chore_never_logged = create_chore(user)
+        other_user_chore = create_chore(create_random_user())
+        create_log(now, other_user_chore, other_user_chore.user)
+
+        with mock.patch.object(actions, "schedule_chores", wraps=actions.schedule_chores) as schedule:
+            create_away_date(user, now.date() + td(days=1),
+                             now.date() + td(days=1))
+
+        scheduled_ids = [chore.id for chore in schedule.call_args.args[0]]
+        self.assertEqual(scheduled_ids, [chore_pending.id])
+        self.assertSchedule(chore_finished_window,
+                            now - td(days=29), now - td(days=28))
+        self.assertSchedule(chore_never_logged, None, None)
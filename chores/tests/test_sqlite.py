@@ -0,0 +1,24 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from chores import sqlite
+
+
+class TestApplyPragmas(TestCase):
+
+    def get_pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_applied_on_connect(self):
+        self.assertEqual(self.get_pragma("cache_size"), -16 * 1024)
+        self.assertEqual(self.get_pragma("busy_timeout"), 5000)
+        self.assertEqual(self.get_pragma("temp_store"), 2)
+
+    def test_applies_settings(self):
+        # test cases run inside a transaction where the synchronous level is fixed
+        for cache_size in (-1024, -16 * 1024):
+            with override_settings(CHOREMINDER_SQLITE_PRAGMAS=dict(cache_size=cache_size)):
+                sqlite.apply_pragmas(None, connection)
+            self.assertEqual(self.get_pragma("cache_size"), cache_size)
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.test import TestCase, override_settings
+
+from chores import actions, timing
+
+from .utils import TIMED_TEMPLATES
+
+
+class TestMeasure(TestCase):
+
+    def test_ignored_outside_requests(self):
+        with timing.measure("status"):
+            pass
+
+        self.assertIsNone(timing.current_timings.get())
+
+    @override_settings(TEMPLATES=TIMED_TEMPLATES)
+    def test_accumulates(self):
+        timings = timing.RequestTimings()
+        token = timing.current_timings.set(timings)
+        try:
+            with timing.measure("status"):
+                pass
+            actions.schedule_chores([])
+            render_to_string("chores/fragments/chore_list_token.html")
+        finally:
+            timing.current_timings.reset(token)
+
+        self.assertEqual(timings.counts, dict(status=2, template=1))
+        self.assertGreater(timings.durations["template"], 0)
+
+
+class TestCheckTemplateTiming(TestCase):
+
+    def test_templates_untimed_by_default(self):
+        self.assertEqual(settings.TEMPLATES[0]["BACKEND"], "django.template.backends.django.DjangoTemplates")
+        self.assertEqual(timing.check_template_timing(), [])
+
+    @override_settings(CHOREMINDER_PERFORMANCE_TIMING=True)
+    def test_warns_when_timing_without_timed_templates(self):
+        warning, = timing.check_template_timing()
+        self.assertEqual(warning.id, "chores.W001")
+
+        with override_settings(TEMPLATES=TIMED_TEMPLATES):
+            self.assertEqual(timing.check_template_timing(), [])
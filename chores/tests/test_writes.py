@@ -0,0 +1,168 @@
+import threading
+import time
+from unittest import mock
+
+from django.db import OperationalError, connection, transaction
+from django.db.models import Max
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from chores import models, writes
+
+from .utils import create_chore, create_random_user
+
+
+class TestImmediateAtomic(TransactionTestCase):
+
+    def test_begins_immediate(self):
+        with CaptureQueriesContext(connection) as queries:
+            with writes.immediate_atomic():
+                models.Tag.objects.count()
+
+        self.assertEqual(queries.captured_queries[0]["sql"], "BEGIN IMMEDIATE")
+
+        # nested blocks use savepoints and later transactions start as usual
+        with CaptureQueriesContext(connection) as queries:
+            with writes.immediate_atomic():
+                with writes.immediate_atomic():
+                    pass
+            with transaction.atomic():
+                models.Tag.objects.count()
+
+        self.assertEqual(queries.captured_queries[0]["sql"], "BEGIN IMMEDIATE")
+        self.assertTrue(queries.captured_queries[1]["sql"].startswith("SAVEPOINT"))
+        self.assertIn("BEGIN", [query["sql"] for query in queries.captured_queries])
+
+    def test_sqlite_transaction_hook_available(self):
+        # immediate_atomic relies on this private hook of Django's sqlite backend
+        self.assertTrue(callable(getattr(connection, writes.SQLITE_TRANSACTION_HOOK, None)))
+
+
+class TestRunWithRetries(TransactionTestCase):
+
+    @override_settings(CHOREMINDER_WRITE_RETRY_DELAY=0)
+    def test_retries_locked_errors(self):
+        func = mock.Mock(side_effect=[OperationalError("database is locked"), 1])
+        self.assertEqual(writes.run_with_retries(func), 1)
+        self.assertEqual(func.call_count, 2)
+
+    @override_settings(CHOREMINDER_WRITE_RETRY_DELAY=0, CHOREMINDER_WRITE_RETRY_ATTEMPTS=3)
+    def test_bounded_attempts(self):
+        func = mock.Mock(side_effect=OperationalError("database is locked"))
+        with self.assertRaises(OperationalError):
+            writes.run_with_retries(func)
+        self.assertEqual(func.call_count, 3)
+
+    def test_other_errors_not_retried(self):
+        func = mock.Mock(side_effect=OperationalError("no such table"))
+        with self.assertRaises(OperationalError):
+            writes.run_with_retries(func)
+        func.assert_called_once()
+
+
+class TestCreateLog(TestCase):
+
+    def test_updates_chore(self):
+        user = create_random_user()
+        chore = create_chore(user)
+        now = timezone.now()
+
+        log = writes.create_log(chore, user, now)
+        self.assertIsNotNone(log.pk)
+
+        chore.refresh_from_db()
+        self.assertEqual(chore.last_logged_at, now)
+        self.assertIsNotNone(chore.next_due)
+
+
+class TestLogBatcher(TestCase):
+
+    def test_writes_immediately_and_groups_waiting_logs(self):
+        first_write_started, release_first_write = threading.Event(), threading.Event()
+        batches = []
+
+        def write_logs(logs):
+            batches.append(list(logs))
+            if len(batches) == 1:
+                first_write_started.set()
+                release_first_write.wait(timeout=10)
+            return logs
+
+        batcher = writes.LogBatcher()
+        with mock.patch.object(writes, "write_logs", side_effect=write_logs):
+            # the first log is written without waiting for others
+            first = threading.Thread(target=batcher.submit, args=("first",))
+            first.start()
+            self.assertTrue(first_write_started.wait(timeout=10))
+
+            # logs arriving during that write wait for it and share the next one
+            waiting = [threading.Thread(target=batcher.submit, args=(log,)) for log in ("second", "third")]
+            for thread in waiting:
+                thread.start()
+            while len(batcher._pending) < 2:
+                time.sleep(0.001)
+
+            release_first_write.set()
+            for thread in [first, *waiting]:
+                thread.join(timeout=10)
+
+        self.assertEqual(batches[0], ["first"])
+        self.assertEqual(sorted(batches[1]), ["second", "third"])
+        self.assertEqual(len(batches), 2)
+
+    def test_errors_raised_to_every_waiting_log(self):
+        batcher = writes.LogBatcher()
+        with mock.patch.object(writes, "write_logs", side_effect=OperationalError("database is locked")):
+            with self.assertRaises(OperationalError):
+                batcher.submit("log")
+
+        self.assertFalse(batcher._writing)
+
+
+class TestConcurrentLogPosts(TransactionTestCase):
+
+    def test_no_lost_logs(self):
+        user = create_random_user()
+        chores = [create_chore(user) for _ in range(10)]
+        thread_count, posts_per_thread = 20, 10
+        barrier = threading.Barrier(thread_count)
+        latencies, errors = [], []
+
+        def post_logs(thread_index):
+            try:
+                client = Client()
+                client.force_login(user)
+                barrier.wait(timeout=30)
+                for index in range(posts_per_thread):
+                    chore = chores[(thread_index + index) % len(chores)]
+                    start = time.perf_counter()
+                    response = client.post(reverse("chores:log_chore", args=(chore.id,)))
+                    latencies.append(time.perf_counter() - start)
+                    if response.status_code != 302:
+                        errors.append(response.status_code)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=post_logs, args=(index,))
+                   for index in range(thread_count)]
+        with mock.patch.object(writes, "write_logs", wraps=writes.write_logs) as write_logs:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(models.Log.objects.count(), thread_count * posts_per_thread)
+        for chore in models.Chore.objects.annotate(latest=Max("log__timestamp")):
+            self.assertEqual(chore.last_logged_at, chore.latest)
+            self.assertIsNotNone(chore.next_due)
+
+        # bursts share transactions
+        self.assertLess(write_logs.call_count, thread_count * posts_per_thread)
+
+        latencies.sort()
+        self.assertLess(latencies[int(len(latencies) * 0.99)], 2)
@@ -3,10 +3,14 @@ import random
 import string
 from typing import Optional
 
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.utils import timezone
 
-from chores import models
+from chores import models, timing
+
+# the settings of the template backend that times rendering
+TIMED_TEMPLATES = [dict(settings.TEMPLATES[0], BACKEND=timing.TIMED_BACKEND)]
 
 
 def get_user() -> User:
@@ -1,22 +1,19 @@
 import datetime
-from collections import OrderedDict
+import re
+from unittest import mock
 
 from django.conf import settings
+from django.db import connection
 from django.template import defaultfilters
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
-from chores import forms, model_views, models
+from chores import forms, model_views, models, views
 
 from ..utils import create_random_string
-from .utils import AuthenticatedTest
-
-
-def build_chore_groups(pending_list, completed_list):
-    return OrderedDict((
-        ("Pending", pending_list),
-        ("Completed", completed_list),
-    ))
+from .utils import AuthenticatedTest, AuthenticatedTransactionTest
 
 
 class ChoreIndexViewTests(AuthenticatedTest):
@@ -24,8 +21,7 @@ class ChoreIndexViewTests(AuthenticatedTest):
     def test_no_chores(self):
         response = self.client.get(reverse("chores:index"))
         self.assertContains(response, "No chores to display.")
-        self.assertEqual(
-            response.context["chore_groups"], build_chore_groups([], []))
+        self.assertEqual(response.context["pending_chores"], [])
 
     def test_some_chores(self):
         chore1 = self.create_chore_in_db()
@@ -33,21 +29,24 @@ class ChoreIndexViewTests(AuthenticatedTest):
         response = self.client.get(reverse("chores:index"))
         self.assertContains(response, chore1.name)
         self.assertContains(response, chore2.name)
-        self.assertEqual(response.context["chore_groups"], build_chore_groups(
-            [model_views.Chore(chore1), model_views.Chore(chore2)], []))
+        self.assertEqual(response.context["pending_chores"], [
+            model_views.Chore(chore1), model_views.Chore(chore2)])
 
         # test user 2 cannot list
         self.client.force_login(self.user2)
         response = self.client.get(reverse("chores:index"))
         self.assertContains(response, "No chores to display.")
-        self.assertEqual(
-            response.context["chore_groups"], build_chore_groups([], []))
+        self.assertEqual(response.context["pending_chores"], [])
 
     def test_shows_next_due_and_status(self):
         chore = self.create_chore_in_db()
         log = self.create_log_in_db(chore)
         response = self.client.get(reverse("chores:index"))
-        self.assertContains(response, "Completed")
+        self.assertContains(response, "Completed (1)")
+        self.assertNotContains(response, chore.name)
+
+        response = self.client.get(reverse("chores:list_completed_chores"))
+        self.assertContains(response, chore.name)
         self.assertContains(response, defaultfilters.date(timezone.localtime(
             log.timestamp + datetime.timedelta(days=1)), settings.DATETIME_FORMAT))
 
@@ -85,6 +84,125 @@ class ChoreIndexViewTests(AuthenticatedTest):
         self.assertContains(response, chore3.name)
         self.assertNotContains(response, chore4.name)
 
+    def test_does_not_query_logs(self):
+        chore = self.create_chore_in_db()
+        models.Log.objects.create(timestamp=timezone.now() - datetime.timedelta(days=2),
+                                  chore=chore, user=self.user)
+        completed_chore = self.create_chore_in_db()
+        self.create_log_in_db(completed_chore)
+
+        for url, name in ((reverse("chores:index"), chore.name),
+                          (reverse("chores:list_completed_chores"), completed_chore.name)):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+
+            self.assertContains(response, name)
+            self.assertFalse(any("chores_log" in query["sql"]
+                                 for query in queries.captured_queries))
+
+    def test_completed_chores_loaded_lazily(self):
+        pending_chore = self.create_chore_in_db()
+        completed_chore = self.create_chore_in_db()
+        self.create_log_in_db(completed_chore)
+
+        response = self.client.get(reverse("chores:index"))
+        self.assertContains(response, pending_chore.name)
+        self.assertNotContains(response, completed_chore.name)
+        self.assertContains(response, "Completed (1)")
+        self.assertContains(response, f'hx-get="{views.completed_chores_url(None)}"')
+
+    def test_query_count_independent_of_chore_count(self):
+        tag1 = self.create_tag_in_db()
+        tag2 = self.create_tag_in_db()
+        self.create_away_date_in_db()
+
+        query_counts = []
+        for chore_count in (1, 20):
+            while models.Chore.objects.filter(user=self.user).count() < chore_count:
+                chore = self.create_chore_in_db(tags=[tag1, tag2])
+                self.create_log_in_db(chore)
+
+            for url in (reverse("chores:index"), f"{reverse('chores:index')}?tag={tag1.id}"):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+
+                self.assertEqual(response.status_code, 200)
+                query_counts.append(len(queries))
+
+        self.assertEqual(len(set(query_counts)), 1)
+
+    def test_chore_list_cached(self):
+        chore = self.create_chore_in_db()
+        self.client.get(reverse("chores:index"))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("chores:index"))
+
+        self.assertContains(response, chore.name)
+        self.assertContains(response, 'name="csrfmiddlewaretoken"')
+        self.assertNotContains(response, views.CSRF_TOKEN_PLACEHOLDER)
+        self.assertFalse(any("chores_chore" in query["sql"]
+                             for query in queries.captured_queries))
+
+        self.create_log_in_db(chore)
+        response = self.client.get(reverse("chores:index"))
+        self.assertContains(response, "Completed (1)")
+
+    def test_conditional_get(self):
+        chore = self.create_chore_in_db()
+        response = self.client.get(reverse("chores:index"))
+        etag = response.headers["ETag"]
+        self.assertIn("Last-Modified", response.headers)
+        self.assertIn("no-cache", response.headers["Cache-Control"])
+
+        response = self.client.get(reverse("chores:index"), headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response.templates, [])
+        self.assertEqual(response.headers["ETag"], etag)
+
+        self.create_log_in_db(chore)
+        response = self.client.get(reverse("chores:index"), headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertContains(response, "Completed (1)")
+
+    def test_conditional_get_checked_before_building(self):
+        self.create_chore_in_db()
+        etag = self.client.get(reverse("chores:index")).headers["ETag"]
+
+        # the list is neither built nor read from the cache for a matching etag
+        with mock.patch("chores.views.get_chore_list") as get_chore_list, \
+                CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("chores:index"), headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], etag)
+        get_chore_list.assert_not_called()
+        self.assertFalse(any("chores_chore" in query["sql"] for query in queries.captured_queries))
+
+    def test_etag_depends_on_tag_filter(self):
+        tag = self.create_tag_in_db()
+        _ = self.create_chore_in_db(tags=[tag])
+        response = self.client.get(reverse("chores:index"))
+        etag = response.headers["ETag"]
+
+        response = self.client.get(f"{reverse('chores:index')}?tag={tag.id}",
+                                   headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_etag_changes_at_status_change(self):
+        chore = self.create_chore_in_db()
+        self.create_log_in_db(chore)
+        response = self.client.get(reverse("chores:index"))
+        etag = response.headers["ETag"]
+
+        with mock.patch("django.utils.timezone.now",
+                        return_value=timezone.now() + datetime.timedelta(days=2)):
+            response = self.client.get(reverse("chores:index"), headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
     def test_chore_with_no_log_renders_not_completed(self):
         _ = self.create_chore_in_db()
         response = self.client.get(reverse("chores:index"))
@@ -121,6 +239,70 @@ class ChoreIndexViewTests(AuthenticatedTest):
         self.assertContains(response, "Completed (2)")
 
 
+class ChoreCompletedViewTests(AuthenticatedTest):
+
+    def get_pages(self, url):
+        chore_ids, pages = [], 0
+        while url is not None:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            chore_ids.extend(chore.id for chore in response.context["chores"])
+            url = response.context["more_url"]
+            pages += 1
+
+        return chore_ids, pages
+
+    @override_settings(CHOREMINDER_COMPLETED_PAGE_SIZE=2)
+    def test_keyset_pages(self):
+        now = timezone.now()
+        chores = [self.create_chore_in_db() for _ in range(5)]
+        for chore, hours_ago in zip(chores, (3, 12, 0, 6, 0)):
+            models.Log.objects.create(timestamp=now - datetime.timedelta(hours=hours_ago),
+                                      chore=chore, user=self.user)
+        self.create_chore_in_db()
+
+        chore_ids, pages = self.get_pages(reverse("chores:list_completed_chores"))
+        self.assertEqual(chore_ids, [chores[1].id, chores[3].id, chores[0].id,
+                                     chores[2].id, chores[4].id])
+        self.assertEqual(pages, 3)
+
+        response = self.client.get(reverse("chores:list_completed_chores"))
+        self.assertContains(response, "Load more")
+
+    @override_settings(CHOREMINDER_COMPLETED_PAGE_SIZE=2)
+    def test_pages_stable_over_time(self):
+        now = timezone.now()
+        chores = [self.create_chore_in_db() for _ in range(5)]
+        for chore, hours_ago in zip(chores, (3, 12, 0, 6, 1)):
+            models.Log.objects.create(timestamp=now - datetime.timedelta(hours=hours_ago),
+                                      chore=chore, user=self.user)
+
+        response = self.client.get(reverse("chores:list_completed_chores"))
+        chore_ids = [chore.id for chore in response.context["chores"]]
+
+        # later pages keep the first page's time, even after some chores became due
+        with mock.patch("django.utils.timezone.now", return_value=now + datetime.timedelta(hours=14)):
+            more_chore_ids, _ = self.get_pages(response.context["more_url"])
+
+        self.assertEqual(chore_ids + more_chore_ids, [chores[1].id, chores[3].id, chores[0].id,
+                                                      chores[4].id, chores[2].id])
+
+    def test_tag_filter(self):
+        tag = self.create_tag_in_db()
+        chore1 = self.create_chore_in_db(tags=[tag])
+        chore2 = self.create_chore_in_db()
+        self.create_log_in_db(chore1)
+        self.create_log_in_db(chore2)
+
+        chore_ids, _ = self.get_pages(views.completed_chores_url(tag.id))
+        self.assertEqual(chore_ids, [chore1.id])
+
+        # test user 2 cannot list
+        self.client.force_login(self.user2)
+        chore_ids, _ = self.get_pages(reverse("chores:list_completed_chores"))
+        self.assertEqual(chore_ids, [])
+
+
 class ChoreAddViewTests(AuthenticatedTest):
 
     def test_get(self):
@@ -302,7 +484,7 @@ class ChoreDeleteViewTests(AuthenticatedTest):
         self.assertEqual(response.status_code, 404)
 
 
-class ChoreLogViewTests(AuthenticatedTest):
+class ChoreLogViewTests(AuthenticatedTransactionTest):
 
     def test_unknown_chore(self):
         response = self.client.post(reverse("chores:log_chore", args=(1,)))
@@ -315,6 +497,9 @@ class ChoreLogViewTests(AuthenticatedTest):
         self.assertRedirects(response, reverse("chores:index"))
         self.assertEqual(chore.log_set.count(), 1)
 
+        chore.refresh_from_db()
+        self.assertEqual(chore.last_logged_at, chore.log_set.get().timestamp)
+
     def test_redirects_using_referer(self):
         chore = self.create_chore_in_db()
         response = self.client.post(
@@ -332,4 +517,186 @@ class ChoreLogViewTests(AuthenticatedTest):
         response = self.client.post(
             reverse("chores:log_chore", args=(chore.id,)), headers={"HX-Request": "true"})
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, chore.id)
+        self.assertContains(response, 'id="chore-list"')
+        self.assertContains(response, "Completed (1)")
+
+    def get_chore_list_token(self, url=None):
+        response = self.client.get(url or reverse("chores:index"))
+        return re.search(r'name="chore_list_token" value="([^"]*)"', response.content.decode()).group(1)
+
+    def log_chore_with_htmx(self, chore, token):
+        with self.committed():
+            return self.client.post(reverse("chores:log_chore", args=(chore.id,)),
+                                    dict(chore_list_token=token), headers={"HX-Request": "true"})
+
+    def test_htmx_updates_groups_for_logged_chore(self):
+        completed = self.create_chore_in_db()
+        models.Log.objects.create(timestamp=timezone.now() - datetime.timedelta(hours=12),
+                                  chore=completed, user=self.user)
+        chore1 = self.create_chore_in_db()
+        chore2 = self.create_chore_in_db()
+        token = self.get_chore_list_token()
+
+        response = self.log_chore_with_htmx(chore1, token)
+        self.assertEqual(response.headers["HX-Retarget"], f"#chore-container-{chore1.id}")
+        self.assertEqual(response.headers["HX-Reswap"], "delete")
+        self.assertContains(response, 'id="chore-group-Completed-chores" hx-swap-oob="true"')
+        self.assertNotContains(response, f'id="chore-container-{chore1.id}"')
+        self.assertNotContains(response, f'id="chore-container-{chore2.id}"')
+        self.assertNotContains(response, 'id="chore-list"')
+        self.assertContains(response, "Pending (1)")
+        self.assertContains(response, "Completed (2)")
+        self.assertNotContains(response, views.CSRF_TOKEN_PLACEHOLDER)
+
+        # the returned token keeps the client list current
+        new_token = re.search(r'value="([^"]*)" hx-swap-oob="true"', response.content.decode()).group(1)
+        self.assertNotEqual(new_token, token)
+        response = self.log_chore_with_htmx(completed, new_token)
+        self.assertEqual(response.headers["HX-Reswap"], "delete")
+        self.assertContains(response, "Pending (1)")
+        self.assertContains(response, "Completed (2)")
+
+    def test_htmx_updates_groups_with_tag_filter(self):
+        tag = self.create_tag_in_db()
+        chore1 = self.create_chore_in_db(tags=[tag])
+        chore2 = self.create_chore_in_db(tags=[tag])
+        self.create_log_in_db(chore2)
+        self.create_chore_in_db()
+        self.create_chore_in_db(tags=[tag])
+        token = self.get_chore_list_token(f"{reverse('chores:index')}?tag={tag.id}")
+
+        response = self.log_chore_with_htmx(chore1, token)
+        self.assertEqual(response.headers["HX-Reswap"], "delete")
+        self.assertContains(response, "Pending (1)")
+        self.assertContains(response, "Completed (2)")
+
+    def test_htmx_stale_list_rendered_in_full(self):
+        chore1 = self.create_chore_in_db()
+        chore2 = self.create_chore_in_db()
+        self.create_log_in_db(chore2)
+        self.create_chore_in_db()
+        token = self.get_chore_list_token()
+
+        self.create_chore_in_db()
+        response = self.log_chore_with_htmx(chore1, token)
+        self.assertNotIn("HX-Reswap", response.headers)
+        self.assertContains(response, 'id="chore-list"')
+        self.assertContains(response, "Pending (2)")
+
+    def test_htmx_group_markup_change_rendered_in_full(self):
+        chore1 = self.create_chore_in_db()
+        chore2 = self.create_chore_in_db()
+
+        # the completed group has no list yet
+        response = self.log_chore_with_htmx(chore1, self.get_chore_list_token())
+        self.assertNotIn("HX-Reswap", response.headers)
+        self.assertContains(response, 'id="chore-list"')
+
+        # the pending group becomes empty
+        response = self.log_chore_with_htmx(chore2, self.get_chore_list_token())
+        self.assertNotIn("HX-Reswap", response.headers)
+        self.assertContains(response, "Pending (0)")
+
+    def test_htmx_expired_list_rendered_in_full(self):
+        chore1 = self.create_chore_in_db()
+        chore2 = self.create_chore_in_db()
+        self.create_log_in_db(chore2)
+        self.create_chore_in_db()
+        token = self.get_chore_list_token()
+
+        with mock.patch("django.utils.timezone.now",
+                        return_value=timezone.now() + datetime.timedelta(days=2)):
+            response = self.log_chore_with_htmx(chore1, token)
+        self.assertNotIn("HX-Reswap", response.headers)
+        self.assertContains(response, 'id="chore-list"')
+
+
+class ChoreBulkLogViewTests(AuthenticatedTest):
+
+    def test_logs_selected_chores_in_one_write(self):
+        chore1 = self.create_chore_in_db()
+        chore2 = self.create_chore_in_db()
+        unselected = self.create_chore_in_db()
+        with mock.patch("chores.writes.write_logs", wraps=views.writes.write_logs) as write_logs:
+            response = self.client.post(reverse("chores:log_chores"),
+                                        {"chore_ids": [chore1.id, chore2.id]})
+        self.assertRedirects(response, reverse("chores:index"))
+        write_logs.assert_called_once()
+
+        self.assertEqual(models.Log.objects.count(), 2)
+        self.assertEqual(unselected.log_set.count(), 0)
+        for chore in (chore1, chore2):
+            chore.refresh_from_db()
+            self.assertEqual(chore.last_logged_at, chore.log_set.get().timestamp)
+
+    def test_other_user_chore(self):
+        chore = self.create_chore_in_db()
+        self.client.force_login(self.user2)
+        response = self.client.post(reverse("chores:log_chores"), {"chore_ids": [chore.id]})
+        self.assertRedirects(response, reverse("chores:index"))
+        self.assertEqual(models.Log.objects.count(), 0)
+
+    def test_redirects_using_referer(self):
+        chore = self.create_chore_in_db()
+        response = self.client.post(reverse("chores:log_chores"), {"chore_ids": [chore.id]},
+                                    HTTP_REFERER="http://example.com/path/?tag=1")
+        self.assertRedirects(response, f"{reverse('chores:index')}?tag=1")
+
+    def test_htmx_returns_rendered_chore_list(self):
+        chore1 = self.create_chore_in_db()
+        chore2 = self.create_chore_in_db()
+        response = self.client.post(reverse("chores:log_chores"), {"chore_ids": [chore1.id, chore2.id]},
+                                    headers={"HX-Request": "true"})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<div id="chore-list">')
+        self.assertContains(response, "Pending (0)")
+        self.assertContains(response, "Completed (2)")
+
+
+@override_settings(CHOREMINDER_LOG_PAGE_SIZE=2)
+class ChoreLogHistoryViewTests(AuthenticatedTest):
+
+    def setUp(self):
+        super().setUp()
+        self.chore = self.create_chore_in_db()
+        self.now = timezone.now()
+        # two logs share a timestamp so the pages have to break the tie by id
+        self.logs = [models.Log.objects.create(timestamp=timestamp, chore=self.chore, user=self.user)
+                     for timestamp in (self.now - datetime.timedelta(days=2), self.now,
+                                       self.now - datetime.timedelta(days=1), self.now)]
+
+    def test_other_user(self):
+        self.client.force_login(self.user2)
+        response = self.client.get(reverse("chores:list_chore_logs", args=(self.chore.id,)))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse("chores:download_chore_logs", args=(self.chore.id,)))
+        self.assertEqual(response.status_code, 404)
+
+    def test_keyset_pages(self):
+        response = self.client.get(reverse("chores:list_chore_logs", args=(self.chore.id,)))
+        self.assertTemplateUsed(response, "chores/chore_logs.html")
+        self.assertEqual([log["id"] for log in response.context["logs"]], [self.logs[1].id, self.logs[3].id])
+        more_url = response.context["more_url"]
+        self.assertIsNotNone(more_url)
+        self.assertContains(response, f'hx-get="{defaultfilters.force_escape(more_url)}"')
+
+        response = self.client.get(more_url, headers={"HX-Request": "true"})
+        self.assertTemplateNotUsed(response, "chores/chore_logs.html")
+        self.assertEqual([log["id"] for log in response.context["logs"]], [self.logs[2].id, self.logs[0].id])
+        self.assertIsNone(response.context["more_url"])
+        self.assertNotContains(response, "load-more")
+
+    def test_no_logs(self):
+        chore = self.create_chore_in_db()
+        response = self.client.get(reverse("chores:list_chore_logs", args=(chore.id,)))
+        self.assertContains(response, "No logs to display.")
+
+    def test_download_streams_csv(self):
+        response = self.client.get(reverse("chores:download_chore_logs", args=(self.chore.id,)))
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn(f"chore-{self.chore.id}-logs.csv", response["Content-Disposition"])
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "timestamp,user")
+        self.assertEqual(lines[1:], [f"{log.timestamp.isoformat()},{self.user.username}"
+                                     for log in (self.logs[1], self.logs[3], self.logs[2], self.logs[0])])
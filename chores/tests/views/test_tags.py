@@ -28,6 +28,26 @@ class TagsListViewTests(AuthenticatedTest):
         self.assertEqual(response.context["tags"], [])
 
 
+    def test_conditional_get(self):
+        response = self.client.get(reverse("chores:list_tags"))
+        etag = response.headers["ETag"]
+        self.assertIn("Last-Modified", response.headers)
+
+        response = self.client.get(reverse("chores:list_tags"), headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.templates, [])
+
+        self.create_tag_in_db()
+        response = self.client.get(reverse("chores:list_tags"), headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+        # the etag is not shared between users
+        self.client.force_login(self.user2)
+        response = self.client.get(reverse("chores:list_tags"), headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+
+
 class TagAddViewTests(AuthenticatedTest):
 
     def test_get(self):
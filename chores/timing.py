@@ -0,0 +1,113 @@
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from django.conf import settings
+from django.core import checks
+from django.db import connection
+from django.template import TemplateDoesNotExist
+from django.template.backends import django as django_backend
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# the template backend the opt-in performance timing needs, Django's own is used otherwise
+TIMED_BACKEND = "chores.timing.TimedDjangoTemplates"
+
+
+class RequestTimings(object):
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    def add(self, name: str, duration: float):
+        self.durations[name] = self.durations.get(name, 0) + duration
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def database_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add("db", time.perf_counter() - start)
+
+
+# set by the performance middleware for the duration of a request, None otherwise
+current_timings: contextvars.ContextVar[Optional[RequestTimings]] = \
+    contextvars.ContextVar("chores_request_timings", default=None)
+
+
+@contextmanager
+def measure(name: str):
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+@contextmanager
+def collect() -> Iterator[RequestTimings]:
+    # joins the timings of an enclosing request instead of counting its queries twice
+    timings = current_timings.get()
+    if timings is not None:
+        yield timings
+        return
+
+    timings = RequestTimings()
+    token = current_timings.set(timings)
+    try:
+        with connection.execute_wrapper(timings.database_wrapper):
+            yield timings
+    finally:
+        current_timings.reset(token)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with measure(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def check_template_timing(app_configs=None, **kwargs) -> List[checks.CheckMessage]:
+    if not settings.CHOREMINDER_PERFORMANCE_TIMING or \
+            any(engine["BACKEND"] == TIMED_BACKEND for engine in settings.TEMPLATES):
+        return []
+
+    return [checks.Warning(
+        "Templates are not timed",
+        hint=f"Set the BACKEND of TEMPLATES to {TIMED_BACKEND} to report the template rendering time.",
+        id="chores.W001",
+    )]
+
+
+class TimedTemplate(django_backend.Template):
+
+    def render(self, context=None, request=None):
+        with measure("template"):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(django_backend.DjangoTemplates):
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
@@ -0,0 +1,241 @@
+import contextlib
+import csv
+import datetime
+import json
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, TextIO, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from django.db import models as db_models
+from django.utils.dateparse import parse_date, parse_datetime, parse_duration
+from django.utils.duration import duration_iso_string
+
+from chores import actions, caching, models, writes
+from chores.type_helpers import UserType
+
+Record = Dict[str, Any]
+# a record with the line of the input it was read from
+NumberedRecord = Tuple[int, Record]
+
+# records are written in this order so every reference points at an earlier record
+RECORD_FIELDS = OrderedDict((
+    ("tag", ("id", "name")),
+    ("away_date", ("id", "name", "start_date", "end_date")),
+    ("chore", ("id", "name", "description", "due_duration", "overdue_duration")),
+    ("chore_tag", ("chore", "tag")),
+    ("log", ("id", "chore", "timestamp")),
+))
+CSV_FIELDS = ["type", *OrderedDict.fromkeys(
+    field for fields in RECORD_FIELDS.values() for field in fields)]
+
+
+def export_querysets(user: UserType) -> Dict[str, db_models.QuerySet]:
+    return OrderedDict((
+        ("tag", models.Tag.objects.filter(user=user).values_list("id", "name")),
+        ("away_date", models.AwayDate.objects.filter(user=user).values_list(
+            "id", "name", "start_date", "end_date")),
+        ("chore", models.Chore.objects.filter(user=user).values_list(
+            "id", "name", "description", "due_duration", "overdue_duration")),
+        ("chore_tag", models.Chore.tags.through.objects.filter(chore__user=user).values_list(
+            "chore_id", "tag_id")),
+        ("log", models.Log.objects.filter(chore__user=user).values_list(
+            "id", "chore_id", "timestamp")),
+    ))
+
+
+def serialize_value(value: Any) -> Any:
+    if isinstance(value, datetime.timedelta):
+        return duration_iso_string(value)
+
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+
+    return value
+
+
+def export_records(user: UserType, chunk_size: int) -> Iterator[Record]:
+    for record_type, queryset in export_querysets(user).items():
+        fields = RECORD_FIELDS[record_type]
+        for row in queryset.order_by("pk").iterator(chunk_size=chunk_size):
+            record = dict(zip(fields, map(serialize_value, row)))
+            record["type"] = record_type
+            yield record
+
+
+def write_jsonl(records: Iterable[Record], output: TextIO) -> int:
+    count = 0
+    for record in records:
+        output.write(json.dumps(record) + "\n")
+        count += 1
+
+    return count
+
+
+def write_csv(records: Iterable[Record], output: TextIO) -> int:
+    writer = csv.DictWriter(output, CSV_FIELDS, lineterminator="\n")
+    writer.writeheader()
+    count = 0
+    for record in records:
+        writer.writerow(record)
+        count += 1
+
+    return count
+
+
+class InvalidRecord(ValueError):
+
+    def __init__(self, lines: str, error: Exception):
+        super().__init__(f"{lines}: {error}")
+
+
+def read_jsonl(input: TextIO) -> Iterator[NumberedRecord]:
+    for line_number, line in enumerate(input, 1):
+        if line.strip():
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as error:
+                raise InvalidRecord(f"line {line_number}", error)
+
+
+def read_csv(input: TextIO) -> Iterator[NumberedRecord]:
+    reader = csv.DictReader(input)
+    try:
+        for row in reader:
+            yield reader.line_num, {field: value for field, value in row.items() if value != ""}
+    except csv.Error as error:
+        raise InvalidRecord(f"line {reader.line_num}", error)
+
+
+WRITERS: Dict[str, Callable[[Iterable[Record], TextIO], int]] = dict(jsonl=write_jsonl, csv=write_csv)
+READERS: Dict[str, Callable[[TextIO], Iterator[NumberedRecord]]] = dict(jsonl=read_jsonl, csv=read_csv)
+
+
+def parse_optional(parse: Callable[[str], Any], value: Any) -> Any:
+    if value is None:
+        return None
+
+    parsed = parse(str(value))
+    if parsed is None:
+        raise ValueError(f"Invalid value: {value!r}")
+
+    return parsed
+
+
+class Importer(object):
+
+    def __init__(self, user: UserType, batch_size: int):
+        self.user = user
+        self.batch_size = batch_size
+        # only the ids other records reference are remembered, so logs never accumulate
+        self.id_maps: Dict[str, Dict[int, int]] = dict(tag={}, chore={})
+        self.pending: Dict[str, List[NumberedRecord]] = OrderedDict(
+            (record_type, []) for record_type in RECORD_FIELDS)
+        self.counts = OrderedDict((record_type, 0) for record_type in RECORD_FIELDS)
+
+    def add(self, line: int, record: Record):
+        record_type = record.get("type")
+        if record_type not in self.pending:
+            raise InvalidRecord(f"line {line}", ValueError(f"Unknown record type: {record_type!r}"))
+
+        self.pending[record_type].append((line, record))
+        if len(self.pending[record_type]) >= self.batch_size:
+            self.flush(record_type)
+
+    def flush(self, until: str | None = None):
+        # each batch is a savepoint of the import's transaction, or a transaction of its own
+        # when the import commits per batch
+        with writes.immediate_atomic():
+            # earlier record types are flushed first so their new ids are known
+            for record_type, records in self.pending.items():
+                if records:
+                    self.create(record_type, records)
+                    self.pending[record_type] = []
+
+                if record_type == until:
+                    break
+
+    def build(self, record_type: str, line: int, record: Record) -> db_models.Model:
+        try:
+            return getattr(self, f"build_{record_type}")(record)
+        except (KeyError, TypeError, ValueError, ValidationError) as error:
+            raise InvalidRecord(f"line {line}", error)
+
+    def create(self, record_type: str, records: List[NumberedRecord]):
+        objects = [self.build(record_type, line, record) for line, record in records]
+        try:
+            created = type(objects[0]).objects.bulk_create(objects, batch_size=self.batch_size)
+        except IntegrityError as error:
+            raise InvalidRecord(f"lines {records[0][0]}-{records[-1][0]}", error)
+
+        if record_type in self.id_maps:
+            id_map = self.id_maps[record_type]
+            for (_, record), instance in zip(records, created):
+                id_map[int(record["id"])] = instance.pk
+
+        self.counts[record_type] += len(created)
+
+    def lookup(self, record_type: str, value: Any) -> int:
+        try:
+            return self.id_maps[record_type][int(value)]
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Unknown {record_type} id: {value!r}")
+
+    def validate(self, instance: db_models.Model, exclude: Iterable[str]) -> db_models.Model:
+        # skip the checks that would query the database for every row
+        instance.full_clean(exclude=exclude, validate_unique=False, validate_constraints=False)
+        return instance
+
+    def build_tag(self, record: Record) -> models.Tag:
+        return self.validate(models.Tag(name=record.get("name"), user=self.user), ["user"])
+
+    def build_away_date(self, record: Record) -> models.AwayDate:
+        return self.validate(models.AwayDate(
+            name=record.get("name"),
+            start_date=parse_optional(parse_date, record.get("start_date")),
+            end_date=parse_optional(parse_date, record.get("end_date")),
+            user=self.user), ["user"])
+
+    def build_chore(self, record: Record) -> models.Chore:
+        return self.validate(models.Chore(
+            name=record.get("name"),
+            description=record.get("description") or "",
+            due_duration=parse_optional(parse_duration, record.get("due_duration")),
+            overdue_duration=parse_optional(parse_duration, record.get("overdue_duration")),
+            user=self.user), ["user"])
+
+    def build_chore_tag(self, record: Record) -> db_models.Model:
+        return models.Chore.tags.through(
+            chore_id=self.lookup("chore", record.get("chore")),
+            tag_id=self.lookup("tag", record.get("tag")))
+
+    def build_log(self, record: Record) -> models.Log:
+        return self.validate(models.Log(
+            timestamp=parse_optional(parse_datetime, record.get("timestamp")),
+            chore_id=self.lookup("chore", record.get("chore")),
+            user=self.user), ["chore", "user"])
+
+
+def import_records(user: UserType,
+                   records: Iterable[NumberedRecord],
+                   batch_size: int,
+                   commit_per_batch: bool = False) -> Dict[str, int]:
+    importer = Importer(user, batch_size)
+    # one transaction holds the write lock for the whole import. Committing per batch keeps the
+    # app writable, but a failed import then keeps the batches committed before the error
+    with contextlib.nullcontext() if commit_per_batch else writes.immediate_atomic():
+        try:
+            for line, record in records:
+                importer.add(line, record)
+
+            importer.flush()
+        finally:
+            # bulk_create skips the signals that keep the denormalized chore columns up to date
+            with writes.immediate_atomic():
+                chores = models.Chore.objects.filter(user=user)
+                actions.refresh_last_logged_at(chores.values("pk"))
+                actions.refresh_schedules(chores.filter(last_logged_at__isnull=False))
+
+            caching.bump_data_version(user.pk)
+
+    return importer.counts
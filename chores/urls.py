@@ -6,10 +6,16 @@ app_name = "chores"
 urlpatterns = [
     path("", views.index, name="index"),
     path("add", views.add_chore, name="add_chore"),
+    path("chores/completed", views.list_completed_chores,
+         name="list_completed_chores"),
     path("chores/<int:chore_id>/edit", views.edit_chore, name="edit_chore"),
     path("chores/<int:chore_id>/delete",
          views.delete_chore, name="delete_chore"),
+    path("chores/<int:chore_id>/logs", views.list_chore_logs, name="list_chore_logs"),
+    path("chores/<int:chore_id>/logs.csv",
+         views.download_chore_logs, name="download_chore_logs"),
     path("chores/<int:chore_id>/logs/add", views.log_chore, name="log_chore"),
+    path("chores/logs/add", views.log_chores, name="log_chores"),
     path("tags", views.list_tags, name="list_tags"),
     path("tags/add", views.add_tag, name="add_tag"),
     path("tags/<int:tag_id>/edit", views.edit_tag, name="edit_tag"),
@@ -20,4 +26,5 @@ urlpatterns = [
          views.edit_away_date, name="edit_away_date"),
     path("away-dates/<int:away_date_id>/delete",
          views.delete_away_date, name="delete_away_date"),
+    path("metrics", views.list_metrics, name="list_metrics"),
 ]
@@ -1,37 +1,222 @@
+import csv
+import datetime
+import hashlib
+import hmac
+import itertools
 import urllib.parse
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.http import HttpRequest, QueryDict
+from django.http import (Http404, HttpRequest, HttpResponse,
+                         HttpResponseForbidden, HttpResponseNotModified,
+                         QueryDict, StreamingHttpResponse)
+from django.middleware.csrf import get_token
 from django.shortcuts import get_object_or_404, redirect, render, resolve_url
+from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_etags, quote_etag
+from django.utils.safestring import mark_safe
 from django.views.decorators.http import require_GET, require_POST
+from django_htmx.http import reswap, retarget
 from django_htmx.middleware import HtmxDetails
 
-from chores import actions, forms, models, queries
+from chores import (caching, forms, metrics, model_views, models, queries,
+                    writes)
 from .type_helpers import UserType
 
+CSRF_TOKEN_PLACEHOLDER = "CSRF_TOKEN_PLACEHOLDER"
+EPOCH = datetime.datetime.fromtimestamp(0, tz=datetime.timezone.utc)
+
 
 def get_htmx_details(request: HttpRequest) -> HtmxDetails:
     return request.htmx
 
 
-def get_chore_list_chores(user: UserType, filter_form_data: QueryDict):
-    tag_form = forms.TagFilterForm(user, filter_form_data)
-    tag_id = (tag_form.cleaned_data["tag"].id
-              if tag_form.is_valid() and tag_form.cleaned_data["tag"] is not None
-              else None)
-    return actions.get_grouped_sorted_chores(user, tag_id), tag_form, tag_id
+def format_expiry(expires_at: datetime.datetime | None) -> str:
+    return "" if expires_at is None else str((expires_at - EPOCH) // datetime.timedelta(microseconds=1))
+
+
+def parse_expiry(expires: str) -> datetime.datetime | None:
+    return EPOCH + datetime.timedelta(microseconds=int(expires)) if expires else None
+
+
+def make_chore_list_token(version: int | None,
+                          expires_at: datetime.datetime | None,
+                          tag_id: int | None) -> str:
+    return f"{version}:{format_expiry(expires_at)}:{tag_id or ''}"
+
+
+def parse_chore_list_token(token: str | None) -> Optional[Tuple[int, Optional[datetime.datetime], Optional[int]]]:
+    try:
+        version, expires, tag_id = token.split(":")
+        return int(version), parse_expiry(expires), int(tag_id) if tag_id else None
+    except (AttributeError, OverflowError, ValueError):
+        return None
+
+
+def completed_chores_url(tag_id: int | None,
+                         after: Optional[Tuple[datetime.datetime, float, int]] = None) -> str:
+    query = dict(tag=tag_id or "")
+    if after is not None:
+        as_of, weight, chore_id = after
+        query["after"] = "{}:{!r}:{}".format((as_of - EPOCH) // datetime.timedelta(microseconds=1),
+                                             weight, chore_id)
+    return f"{reverse('chores:list_completed_chores')}?{urllib.parse.urlencode(query)}"
+
+
+def parse_completed_cursor(cursor: str | None) -> Optional[Tuple[datetime.datetime, float, int]]:
+    try:
+        as_of, weight, chore_id = cursor.split(":")
+        return EPOCH + datetime.timedelta(microseconds=int(as_of)), float(weight), int(chore_id)
+    except (AttributeError, OverflowError, ValueError):
+        return None
+
+
+def chore_logs_url(chore_id: int, after: Optional[Tuple[datetime.datetime, int]] = None) -> str:
+    url = reverse("chores:list_chore_logs", args=(chore_id,))
+    if after is None:
+        return url
+
+    return f"{url}?{urllib.parse.urlencode(dict(after='{}_{}'.format(after[0].isoformat(), after[1])))}"
+
+
+def parse_log_cursor(cursor: str | None) -> Optional[Tuple[datetime.datetime, int]]:
+    try:
+        timestamp, log_id = cursor.rsplit("_", 1)
+        timestamp = parse_datetime(timestamp)
+        return (timestamp, int(log_id)) if timestamp is not None else None
+    except (AttributeError, ValueError):
+        return None
+
+
+class Echo(object):
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def build_chore_list(user: UserType, tag_id: int | None, version: int) -> caching.CachedChoreList:
+    # only pending chores are rendered, the completed group is loaded when it is opened
+    current_time = timezone.now()
+    pending_chores = queries.query_pending_chores(user, tag_id, current_time)
+    summary = queries.query_group_summary(user, tag_id, current_time)
+    return render_chore_list(pending_chores, summary, tag_id, version)
+
+
+def render_chore_list(pending_chores: List[model_views.Chore], summary: Dict[str, Any],
+                      tag_id: int | None, version: int) -> caching.CachedChoreList:
+    expires_at = min(filter(None, (
+        model_views.earliest_status_change(chore.status for chore in pending_chores),
+        summary["completed_changes_at"],
+    )), default=None)
+    # rendered without a request so the cached html holds a placeholder csrf token
+    html = render_to_string("chores/fragments/chore_list.html", dict(
+        pending_chores=pending_chores,
+        group_counts=OrderedDict((
+            ("Pending", len(pending_chores)),
+            ("Completed", summary["Completed"]),
+        )),
+        more_url=completed_chores_url(tag_id),
+        chore_list_token=make_chore_list_token(version, expires_at, tag_id),
+        csrf_token=CSRF_TOKEN_PLACEHOLDER,
+    ))
+    return caching.CachedChoreList(html, expires_at, version)
+
+
+def get_filter_tag_id(tag_form: forms.TagFilterForm) -> int | None:
+    return (tag_form.cleaned_data["tag"].id
+            if tag_form.is_valid() and tag_form.cleaned_data["tag"] is not None
+            else None)
+
+
+def get_chore_list(request: HttpRequest, filter_form_data: QueryDict):
+    tag_form = forms.TagFilterForm(request.user, filter_form_data)
+    tag_id = get_filter_tag_id(tag_form)
+    chore_list = caching.get_chore_list(
+        request.user.id, tag_id, lambda version: build_chore_list(request.user, tag_id, version))
+    chore_list_html = mark_safe(chore_list.html.replace(
+        CSRF_TOKEN_PLACEHOLDER, get_token(request)))
+    return chore_list, chore_list_html, tag_form, tag_id
+
+
+def etag_digest(request: HttpRequest, *parts: Any) -> str:
+    parts = (request.user.id, request.user.is_superuser) + parts
+    return hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()
+
+
+def make_etag(request: HttpRequest, *parts: Any) -> str:
+    return quote_etag(etag_digest(request, *parts))
+
+
+def chore_list_etag_digest(request: HttpRequest, version: int) -> str:
+    # keyed by the raw tag parameter so it is known before the filter form is validated
+    return etag_digest(request, "index", version, request.GET.get("tag", ""), request.META.get("CSRF_COOKIE"))
+
+
+def make_chore_list_etag(request: HttpRequest, version: int, expires_at: datetime.datetime | None) -> str:
+    # the expiry is kept readable so a client's etag can be checked without building the list
+    return quote_etag(f"{chore_list_etag_digest(request, version)}-{format_expiry(expires_at)}")
+
+
+def find_current_chore_list_etag(request: HttpRequest,
+                                 version: int,
+                                 current_time: datetime.datetime) -> Optional[str]:
+    digest = chore_list_etag_digest(request, version)
+    for etag in parse_etags(request.headers.get("If-None-Match", "")):
+        try:
+            etag_digest_part, expires = etag.removeprefix("W/").strip('"').split("-")
+            expires_at = parse_expiry(expires)
+        except (OverflowError, ValueError):
+            continue
+
+        if hmac.compare_digest(etag_digest_part, digest) and (expires_at is None or expires_at > current_time):
+            return etag
+
+    return None
+
+
+def patch_revalidate(response: HttpResponse, etag: str) -> HttpResponse:
+    response.headers["ETag"] = etag
+    # let the browser keep the page but always revalidate it
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def render_conditional(request: HttpRequest,
+                       etag: str,
+                       last_modified: datetime.datetime,
+                       template_name: str,
+                       get_context: Callable[[], Dict[str, Any]]) -> HttpResponse:
+    last_modified_timestamp = int(last_modified.timestamp())
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified_timestamp)
+    if response is None:
+        response = render(request, template_name, get_context())
+
+    response.headers["Last-Modified"] = http_date(last_modified_timestamp)
+    return patch_revalidate(response, etag)
 
 
 @login_required
 @require_GET
 def index(request: HttpRequest):
-    chore_groups, tag_form, tag_id = get_chore_list_chores(
-        request.user, request.GET)
-    return render(request, "chores/index.html", dict(
+    # a still valid etag is answered from the data version alone, before the list is built
+    current_etag = find_current_chore_list_etag(
+        request, caching.get_data_version(request.user.id), timezone.now())
+    if current_etag is not None:
+        return patch_revalidate(HttpResponseNotModified(), current_etag)
+
+    chore_list, chore_list_html, tag_form, tag_id = get_chore_list(
+        request, request.GET)
+    etag = make_chore_list_etag(request, chore_list.version, chore_list.expires_at)
+    return render_conditional(request, etag, chore_list.built_at, "chores/index.html", lambda: dict(
         title="Chores",
-        chore_groups=chore_groups,
+        chore_list_html=chore_list_html,
         tag_form=tag_form,
         tag_id=tag_id,
     ))
@@ -91,16 +276,39 @@ def delete_chore(request: HttpRequest, chore_id: int):
 @require_POST
 def log_chore(request: HttpRequest, chore_id: int):
     chore = get_object_or_404(models.Chore, pk=chore_id, user=request.user)
-    models.Log.objects.create(timestamp=timezone.now(),
-                              chore=chore, user=request.user)
+    current_time = timezone.now()
+    previous_status = model_views.scheduled_status(chore, current_time)
+    previous_version = caching.get_data_version(request.user.id)
+    writes.create_log(chore, request.user, current_time)
 
     htmx_details = get_htmx_details(request)
     if htmx_details and not htmx_details.boosted:
-        chore_groups, _, _ = get_chore_list_chores(request.user, request.POST)
-        return render(request, "chores/fragments/chore_list.html", dict(
-            chore_groups=chore_groups,
-        ))
+        response = render_logged_chore(
+            request, chore, previous_status, previous_version, current_time)
+        if response is None:
+            _, chore_list_html, _, _ = get_chore_list(request, request.POST)
+            response = HttpResponse(chore_list_html)
+        return response
 
+    return redirect_to_index(request)
+
+
+@login_required
+@require_POST
+def log_chores(request: HttpRequest):
+    form = forms.ChoreSelectionForm(request.user, request.POST)
+    if form.is_valid():
+        writes.create_logs(form.cleaned_data["chore_ids"], request.user, timezone.now())
+
+    htmx_details = get_htmx_details(request)
+    if htmx_details and not htmx_details.boosted:
+        _, chore_list_html, _, _ = get_chore_list(request, request.POST)
+        return HttpResponse(chore_list_html)
+
+    return redirect_to_index(request)
+
+
+def redirect_to_index(request: HttpRequest) -> HttpResponse:
     referer_header = request.headers.get("Referer")
     if referer_header is not None:
         referer_url = urllib.parse.urlparse(referer_header)
@@ -111,16 +319,124 @@ def log_chore(request: HttpRequest, chore_id: int):
     return redirect("chores:index")
 
 
+def render_logged_chore(request: HttpRequest,
+                        chore: models.Chore,
+                        previous_status: model_views.ChoreStatus,
+                        previous_version: int,
+                        current_time: datetime.datetime) -> Optional[HttpResponse]:
+    # moves the logged chore within the client's list, None when it has to be re-rendered
+    token = parse_chore_list_token(request.POST.get("chore_list_token"))
+    if token is None:
+        return None
+
+    version, expires_at, tag_id = token
+    if version != previous_version or (expires_at is not None and expires_at <= current_time):
+        return None
+
+    chore.refresh_from_db()
+    logged_chore = model_views.Chore(chore, model_views.scheduled_status(chore, current_time))
+    if logged_chore.status.state != model_views.ChoreState.COMPLETED:
+        return None
+
+    summary = queries.query_group_summary(request.user, tag_id, current_time)
+    if previous_status.state != model_views.ChoreState.COMPLETED \
+            and (summary["Pending"] == 0 or summary["Completed"] == 1):
+        # an emptied pending group or a first completed chore changes the group markup
+        return None
+
+    # the completed group is reset and reloads its first page when it is open
+    expires_at = min(filter(None, (expires_at, logged_chore.status.changes_at)), default=None)
+    response = render(request, "chores/fragments/chore_logged.html", dict(
+        group_counts=OrderedDict((
+            ("Pending", summary["Pending"]),
+            ("Completed", summary["Completed"]),
+        )),
+        more_url=completed_chores_url(tag_id),
+        chore_list_token=make_chore_list_token(
+            caching.get_data_version(request.user.id), expires_at, tag_id),
+    ))
+    retarget(response, f"#chore-container-{chore.id}")
+    reswap(response, "delete")
+    return response
+
+
 @login_required
 @require_GET
-def list_tags(request: HttpRequest):
-    tags = queries.query_tags(request.user)
-    return render(request, "chores/tags/list.html", dict(
-        title="Tags",
-        tags=tags,
+def list_completed_chores(request: HttpRequest):
+    tag_id = get_filter_tag_id(forms.TagFilterForm(request.user, request.GET))
+    page_size = settings.CHOREMINDER_COMPLETED_PAGE_SIZE
+    # weights depend on the time, so every page is computed as of the first one
+    cursor = parse_completed_cursor(request.GET.get("after"))
+    if cursor is not None:
+        current_time, weight, chore_id = cursor
+        after = (weight, chore_id)
+    else:
+        current_time, after = timezone.now(), None
+    chores = queries.query_completed_chores(request.user, tag_id, current_time, after, page_size + 1)
+
+    more_url = None
+    if len(chores) > page_size:
+        chores = chores[:page_size]
+        more_url = completed_chores_url(tag_id, (current_time, chores[-1].weight, chores[-1].id))
+
+    return render(request, "chores/fragments/completed_chores_page.html", dict(
+        chores=chores,
+        more_url=more_url,
     ))
 
 
+@login_required
+@require_GET
+def list_chore_logs(request: HttpRequest, chore_id: int):
+    chore = get_object_or_404(models.Chore, pk=chore_id, user=request.user)
+    page_size = settings.CHOREMINDER_LOG_PAGE_SIZE
+    logs = queries.query_chore_logs(chore, parse_log_cursor(request.GET.get("after")), page_size + 1)
+
+    more_url = None
+    if len(logs) > page_size:
+        logs = logs[:page_size]
+        more_url = chore_logs_url(chore.id, (logs[-1]["timestamp"], logs[-1]["id"]))
+
+    context = dict(
+        title=f"{chore.name} History",
+        chore=chore,
+        logs=logs,
+        more_url=more_url,
+    )
+    htmx_details = get_htmx_details(request)
+    if htmx_details and not htmx_details.boosted:
+        return render(request, "chores/fragments/chore_logs_page.html", context)
+
+    return render(request, "chores/chore_logs.html", context)
+
+
+@login_required
+@require_GET
+def download_chore_logs(request: HttpRequest, chore_id: int):
+    chore = get_object_or_404(models.Chore, pk=chore_id, user=request.user)
+    # rows are written as they are fetched so memory stays flat for long histories
+    writer = csv.writer(Echo())
+    logs = queries.chore_logs(chore).values_list("timestamp", "username") \
+        .iterator(chunk_size=settings.CHOREMINDER_LOG_EXPORT_CHUNK_SIZE)
+    rows = (writer.writerow((timestamp.isoformat(), username or "")) for timestamp, username in logs)
+    response = StreamingHttpResponse(
+        itertools.chain((writer.writerow(("timestamp", "user")),), rows), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="chore-{chore.id}-logs.csv"'
+    return response
+
+
+@login_required
+@require_GET
+def list_tags(request: HttpRequest):
+    version = caching.get_data_version(request.user.id)
+    etag = make_etag(request, "tags", version)
+    return render_conditional(request, etag, caching.data_version_time(version),
+                              "chores/tags/list.html", lambda: dict(
+                                  title="Tags",
+                                  tags=queries.query_tags(request.user),
+                              ))
+
+
 @login_required
 def add_tag(request: HttpRequest):
     if request.method == "POST":
@@ -176,11 +492,13 @@ def delete_tag(request: HttpRequest, tag_id: int):
 @login_required
 @require_GET
 def list_away_dates(request: HttpRequest):
-    away_dates = queries.query_away_dates(request.user)
-    return render(request, "chores/away_dates/list.html", dict(
-        title="Away Dates",
-        away_dates=away_dates,
-    ))
+    version = caching.get_data_version(request.user.id)
+    etag = make_etag(request, "away-dates", version)
+    return render_conditional(request, etag, caching.data_version_time(version),
+                              "chores/away_dates/list.html", lambda: dict(
+                                  title="Away Dates",
+                                  away_dates=queries.query_away_dates(request.user),
+                              ))
 
 
 @login_required
@@ -233,3 +551,21 @@ def delete_away_date(request: HttpRequest, away_date_id: int):
         title="Delete Away Date",
         away_date=away_date,
     ))
+
+
+@require_GET
+def list_metrics(request: HttpRequest):
+    if not settings.CHOREMINDER_METRICS:
+        raise Http404()
+
+    token = settings.CHOREMINDER_METRICS_TOKEN
+    if token is not None:
+        authorized = hmac.compare_digest(request.headers.get("Authorization", "").encode(),
+                                         f"Bearer {token}".encode())
+    else:
+        authorized = request.user.is_superuser
+
+    if not authorized:
+        return HttpResponseForbidden()
+
+    return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,158 @@
+import datetime
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, List, Optional, TypeVar
+
+from django.conf import settings
+from django.db import OperationalError, transaction
+
+from chores import actions, caching, metrics, models
+from chores.type_helpers import UserType
+
+T = TypeVar("T")
+
+
+# immediate_atomic swaps the private hook Django's sqlite backend starts transactions with,
+# there is no public way to begin a single transaction with BEGIN IMMEDIATE. The hook is
+# guarded by a test, re-check it when upgrading Django. From Django 5.1 the documented
+# OPTIONS["transaction_mode"] = "IMMEDIATE" makes every transaction immediate instead.
+SQLITE_TRANSACTION_HOOK = "_start_transaction_under_autocommit"
+
+
+@contextmanager
+def immediate_atomic(using: Optional[str] = None):
+    connection = transaction.get_connection(using)
+    if connection.vendor != "sqlite" or connection.in_atomic_block \
+            or connection.settings_dict["OPTIONS"].get("transaction_mode") == "IMMEDIATE":
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    # take the write lock up front so the transaction never fails upgrading a read lock
+    start_transaction = getattr(connection, SQLITE_TRANSACTION_HOOK)
+    setattr(connection, SQLITE_TRANSACTION_HOOK, lambda: connection.cursor().execute("BEGIN IMMEDIATE"))
+    try:
+        with transaction.atomic(using=using):
+            setattr(connection, SQLITE_TRANSACTION_HOOK, start_transaction)
+            yield
+    finally:
+        setattr(connection, SQLITE_TRANSACTION_HOOK, start_transaction)
+
+
+def is_locked_error(error: OperationalError) -> bool:
+    return "locked" in str(error) or "busy" in str(error)
+
+
+def run_with_retries(func: Callable[[], T], using: Optional[str] = None) -> T:
+    attempts = settings.CHOREMINDER_WRITE_RETRY_ATTEMPTS
+    delay = settings.CHOREMINDER_WRITE_RETRY_DELAY
+    for attempt in range(attempts):
+        try:
+            with immediate_atomic(using):
+                return func()
+        except OperationalError as error:
+            # retrying inside an outer transaction would reuse its failed state
+            if attempt == attempts - 1 or not is_locked_error(error) \
+                    or transaction.get_connection(using).in_atomic_block:
+                raise
+
+        time.sleep(random.uniform(0, min(delay * 2 ** attempt, settings.CHOREMINDER_WRITE_RETRY_MAX_DELAY)))
+
+
+def write_logs(logs: List[models.Log]) -> List[models.Log]:
+    def write():
+        created = models.Log.objects.bulk_create(
+            [models.Log(timestamp=log.timestamp, chore_id=log.chore_id, user_id=log.user_id)
+             for log in logs])
+        # bulk_create skips the save signals that keep the chores up to date
+        refreshed_chores = actions.refresh_logged_chores({log.chore_id for log in created})
+        return created, refreshed_chores
+
+    created, refreshed_chores = run_with_retries(write)
+    caching.bump_data_versions(chore.user_id for chore in refreshed_chores)
+    metrics.count_logs_written(len(created))
+    for log, created_log in zip(logs, created):
+        log.pk = created_log.pk
+
+    return logs
+
+
+class PendingLog(object):
+
+    def __init__(self, log: models.Log):
+        self.log = log
+        self.is_leader = False
+        # set once the log is written, or when it is promoted to write the next batch
+        self.woken = threading.Event()
+        self.done = False
+        self.error: Optional[BaseException] = None
+
+
+class LogBatcher(object):
+    # group commit: a log is written right away unless another write is running, the logs
+    # arriving meanwhile are written together by one of them as soon as it finishes
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: List[PendingLog] = []
+        self._writing = False
+
+    def submit(self, log: models.Log) -> models.Log:
+        pending = PendingLog(log)
+        with self._lock:
+            self._pending.append(pending)
+            if not self._writing:
+                self._writing = True
+                pending.is_leader = True
+
+        if not pending.is_leader:
+            pending.woken.wait()
+
+        if not pending.done:
+            self.write_pending()
+
+        if pending.error is not None:
+            raise pending.error
+
+        return pending.log
+
+    def write_pending(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+
+        self.write(batch)
+        with self._lock:
+            if self._pending:
+                next_leader = self._pending[0]
+                next_leader.is_leader = True
+                next_leader.woken.set()
+            else:
+                self._writing = False
+
+    def write(self, batch: List[PendingLog]):
+        try:
+            write_logs([pending.log for pending in batch])
+        except BaseException as error:
+            for pending in batch:
+                pending.error = error
+        finally:
+            for pending in batch:
+                pending.done = True
+                pending.woken.set()
+
+
+log_batcher = LogBatcher()
+
+
+def create_log(chore: models.Chore, user: UserType, timestamp: datetime.datetime) -> models.Log:
+    log = models.Log(timestamp=timestamp, chore=chore, user=user)
+    if transaction.get_connection().in_atomic_block or not settings.CHOREMINDER_LOG_BATCHING:
+        return write_logs([log])[0]
+
+    return log_batcher.submit(log)
+
+
+def create_logs(chores: Iterable[models.Chore], user: UserType, timestamp: datetime.datetime) -> List[models.Log]:
+    return write_logs([models.Log(timestamp=timestamp, chore=chore, user=user) for chore in chores])